@@ -0,0 +1,221 @@
+"""
+Batch text diff of the files a folder compare found Different.
+
+The diff engine is pure Python and holds the GIL, so pairs are diffed in
+a ProcessPoolExecutor. At most `max_pending` pairs are queued at a time,
+so memory stays bounded however many rows there are. Each pair gets its
+own DiffBudget: past the time or cost limit the diff of that file turns
+approximate instead of stalling the batch. Files over `max_bytes` are
+reported as too large without being read, and a pair still running after
+`hard_timeout` seconds (the budget does not cover reading or rendering)
+is reported as timed out and its worker killed. Binary files (a NUL byte
+in the first block) are reported without being diffed. Workers are
+spawned, not forked, because the GUI calls this from a thread of a
+Qt process; a pool that breaks (a worker killed by the OS) fails the
+remaining files one by one instead of the whole batch.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from html import escape
+from typing import Iterable, Iterator, Optional, TextIO
+
+try:
+    from .diff import APPROX_NOTICE, DiffBudget, compute_diff, iter_html_rows, iter_html_sections
+except ImportError:
+    from diff import APPROX_NOTICE, DiffBudget, compute_diff, iter_html_rows, iter_html_sections
+
+BINARY_SNIFF = 8192
+DEFAULT_FILE_TIMEOUT = 5.0
+DEFAULT_HARD_TIMEOUT = 60.0
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+_POLL_SECONDS = 0.5
+
+def _read_lines(path: str):
+    """Lines of a text file, or None if it looks binary."""
+    with open(path, "rb") as fp:
+        raw = fp.read()
+    if b"\0" in raw[:BINARY_SNIFF]:
+        return None
+    return raw.decode("utf-8", errors="replace").splitlines()
+
+def diff_file_pair(relpath: str, left_path: str, right_path: str, algorithm: str = "myers",
+                   timeout: Optional[float] = DEFAULT_FILE_TIMEOUT, max_cost: Optional[int] = None,
+                   report: bool = False, context: int = 3, intraline: str = "word",
+                   max_bytes: Optional[int] = DEFAULT_MAX_BYTES) -> dict:
+    """
+    Diff one pair and return its change statistics: lines added and
+    removed, plus binary / approximate / error flags. With report, "html"
+    holds the report table rows for this file. A side larger than
+    max_bytes is not read and the pair gets an error instead.
+    """
+    out = {"relpath": relpath, "added": 0, "removed": 0, "binary": False,
+           "approximate": False, "error": None, "html": None}
+    try:
+        if max_bytes is not None:
+            size = max(os.path.getsize(left_path), os.path.getsize(right_path))
+            if size > max_bytes:
+                out["error"] = f"too large to diff ({size:,} bytes > {max_bytes:,})"
+                return out
+        a = _read_lines(left_path)
+        b = _read_lines(right_path)
+    except OSError as e:
+        out["error"] = str(e)
+        return out
+    if a is None or b is None:
+        out["binary"] = True
+        return out
+    result = compute_diff(a, b, algorithm, DiffBudget(max_cost=max_cost, timeout=timeout))
+    for h in result.changes():
+        out["removed"] += h.a_end - h.a_start
+        out["added"] += h.b_end - h.b_start
+    out["approximate"] = result.approximate
+    if report:
+        out["html"] = "".join(iter_html_rows(result, context, intraline))
+    return out
+
+def _failed(relpath: str, e: BaseException) -> dict:
+    return {"relpath": relpath, "added": 0, "removed": 0, "binary": False,
+            "approximate": False, "error": str(e) or type(e).__name__, "html": None}
+
+_started = None     # in a worker: queue that receives the token of each pair it starts
+
+def _init_worker(started) -> None:
+    global _started
+    _started = started
+
+def _diff_task(token: int, *args) -> dict:
+    _started.put(token)
+    return diff_file_pair(*args)
+
+def _kill_workers(pool: ProcessPoolExecutor) -> None:
+    # there is no public way to stop a task that is already running
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):
+        proc.kill()
+
+def iter_batch_diff(rows: Iterable[dict], workers: Optional[int] = None, algorithm: str = "myers",
+                    timeout: Optional[float] = DEFAULT_FILE_TIMEOUT, max_cost: Optional[int] = None,
+                    report: bool = False, context: int = 3, intraline: str = "word",
+                    max_pending: Optional[int] = None, cancel=None,
+                    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                    hard_timeout: Optional[float] = DEFAULT_HARD_TIMEOUT) -> Iterator[dict]:
+    """
+    Diff every Different row of a folder compare on a process pool and
+    yield diff_file_pair results as they finish (not in input order).
+    hard_timeout is counted from when a worker starts on a pair; when it
+    passes, the pair fails, the workers are killed and the other
+    pairs in flight are resubmitted to a fresh pool. Setting the optional
+    cancel Event stops submitting new pairs; closing the generator
+    cancels the queued ones.
+    """
+    workers = workers or os.cpu_count() or 2
+    max_pending = max_pending or 2 * workers
+    todo = ((r["relpath"], r["left_path"], r["right_path"]) for r in rows if r["status"] == "Different")
+
+    ctx = multiprocessing.get_context("spawn")
+    started_queue = None
+
+    def new_pool():
+        nonlocal started_queue
+        started_queue = ctx.SimpleQueue()     # a fresh one: a killed worker may hold the old one's lock
+        return ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                   initargs=(started_queue,))
+
+    pool = new_pool()
+    pending = {}                # future -> (token, pair)
+    running = {}                # token -> when its worker reported starting it
+    next_token = 0
+
+    def submit(pair):
+        nonlocal next_token
+        try:
+            fut = pool.submit(_diff_task, next_token, *pair, algorithm, timeout, max_cost, report,
+                              context, intraline, max_bytes)
+        except BrokenProcessPool as e:
+            return _failed(pair[0], e)
+        pending[fut] = (next_token, pair)
+        next_token += 1
+        return None
+
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < max_pending and not (cancel is not None and cancel.is_set()):
+                pair = next(todo, None)
+                if pair is None:
+                    exhausted = True
+                    break
+                failed = submit(pair)
+                if failed is not None:
+                    yield failed
+            if not pending:
+                return
+            done, _ = wait(pending, timeout=_POLL_SECONDS if hard_timeout is not None else None,
+                           return_when=FIRST_COMPLETED)
+            now = time.monotonic()
+            while not started_queue.empty():
+                running[started_queue.get()] = now
+            for fut in done:
+                token, pair = pending.pop(fut)
+                running.pop(token, None)
+                try:
+                    res = fut.result()
+                except Exception as e:   # worker crashed or ran out of memory (BrokenProcessPool)
+                    res = _failed(pair[0], e)
+                yield res
+            if hard_timeout is None:
+                continue
+            overdue = [fut for fut, (token, _) in pending.items()
+                       if token in running and now - running[token] > hard_timeout]
+            if not overdue:
+                continue
+            for fut in overdue:
+                yield _failed(pending.pop(fut)[1][0], TimeoutError(f"no result after {hard_timeout:g}s"))
+            requeue = [pair for _, pair in pending.values()]
+            pending.clear()
+            running.clear()
+            _kill_workers(pool)
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = new_pool()
+            for pair in requeue:
+                failed = submit(pair)
+                if failed is not None:
+                    yield failed
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def change_summary(res: dict) -> str:
+    """Short per-file label for the folder view, e.g. '+12 -3'."""
+    if res["error"]:
+        return f"error: {res['error']}"
+    if res["binary"]:
+        return "binary"
+    return f"+{res['added']} -{res['removed']}" + (" (approx.)" if res["approximate"] else "")
+
+def write_batch_report(results: Iterable[dict], fp: TextIO, title: str = "BC-Lite Batch Diff") -> dict:
+    """
+    Stream one combined HTML report over diff_file_pair results (run with
+    report=True) into `fp`, passing each result to the page as it comes.
+    Returns totals: files, added, removed.
+    """
+    totals = {"files": 0, "added": 0, "removed": 0}
+
+    def sections():
+        for res in results:
+            totals["files"] += 1
+            totals["added"] += res["added"]
+            totals["removed"] += res["removed"]
+            heading = f"{escape(res['relpath'], quote=False)} &mdash; {escape(change_summary(res), quote=False)}"
+            if res["html"] is None:
+                body = ["<p>Binary files differ</p>\n" if res["binary"] else "<p>Not diffed</p>\n"]
+            else:
+                body = []
+                if res["approximate"]:
+                    body.append(f"<p class='approx'>{APPROX_NOTICE}</p>\n")
+                body += ["<table>\n", res["html"], "</table>\n"]
+            yield heading, body
+
+    fp.writelines(iter_html_sections(sections(), title))
+    return totals
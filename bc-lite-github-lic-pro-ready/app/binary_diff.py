@@ -0,0 +1,495 @@
+"""
+Binary difference index for the BC-Lite hex diff.
+
+scan_regions compares two buffers (bytes or mmaps) at equal offsets in
+large blocks. Equal blocks cost one memcmp. Inside a block that differs,
+the differing runs are found vectorized: with NumPy (optional) by a
+byte-wise compare and edge detection, without it by XOR-ing the block as
+two big integers and matching runs of non-zero bytes with a regex. No
+Python loop ever runs per byte. The result is a DiffRegions, a sorted
+and compact pair of arrays of [start, end) ranges.
+
+align is the insertion-aware alternative. In the style of rsync, it
+indexes the fixed blocks of the left buffer by a rolling checksum
+(Adler-32, computed by zlib for the index and rolled by hand). It
+then slides a window over the right buffer, rolling the checksum one
+byte at a time until a block matches. After a match it tries the next
+left block straight away, so a long equal stretch costs one memcmp per
+block. The unmatched gaps between matches are trimmed to their common
+prefix and suffix. The result is a list of diff.Hunk (equal, insert,
+delete, replace byte ranges), computed in linear time. RowLayout turns
+either kind of result into hex view rows.
+
+For headless use (scripts/report_cli.py --binary), iter_file_regions
+streams the same equal-offset regions straight from two files, and
+iter_hex_rows turns them into the differing rows plus context. Both keep
+memory constant. Rows are formatted with bytes.hex(' ') and translate
+tables (hex_cells, ascii_cells, diff_marks), never byte by byte.
+"""
+import math
+import os
+import re
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from html import escape
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:     # optional; the XOR fallback needs only the standard library
+    np = None
+
+try:
+    from .diff import Hunk
+except ImportError:
+    from diff import Hunk
+
+SCAN_BLOCK = 4 * 1024 * 1024
+MIN_ALIGN_BLOCK = 256
+MAX_ALIGN_BLOCK = 64 * 1024
+ALIGN_MAX_BYTES = 64 * 1024 * 1024  # larger files are compared at equal offsets by default
+_PROGRESS_STEP = 1024 * 1024
+_ADLER_MOD = 65521
+_NONZERO_RUN = re.compile(rb"[^\x00]+")
+_ASCII = bytes(b if 32 <= b <= 126 else ord(".") for b in range(256))
+_NONZERO_FF = bytes([0] + [0xFF] * 255)
+_MARKS = str.maketrans("0f", " ^")
+ROW_READ = 1024 * 1024
+
+class DiffRegions:
+    """Sorted, non-overlapping [start, end) byte ranges that differ."""
+
+    def __init__(self):
+        self.starts = array("q")
+        self.ends = array("q")
+
+    def add(self, start: int, end: int):
+        """Append a range at or after the last one, merging it if they touch."""
+        if self.ends and self.ends[-1] >= start:
+            self.ends[-1] = max(self.ends[-1], end)
+        else:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> Tuple[int, int]:
+        return self.starts[i], self.ends[i]
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
+
+    def total_bytes(self) -> int:
+        return sum(self.ends) - sum(self.starts)
+
+    def next_after(self, offset: int) -> Optional[int]:
+        """Index of the first region starting after offset, or None."""
+        i = bisect_right(self.starts, offset)
+        return i if i < len(self.starts) else None
+
+    def prev_before(self, offset: int) -> Optional[int]:
+        """Index of the last region starting before offset, or None."""
+        i = bisect_left(self.starts, offset)
+        return i - 1 if i > 0 else None
+
+    def overlaps(self, start: int, end: int) -> bool:
+        """True if any region intersects [start, end)."""
+        i = bisect_right(self.starts, end - 1)
+        return i > 0 and self.ends[i - 1] > start
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    """Byte-wise XOR over the common length: zero where a and b agree."""
+    n = min(len(a), len(b))
+    return (int.from_bytes(a[:n], "big") ^ int.from_bytes(b[:n], "big")).to_bytes(n, "big")
+
+def _block_runs(a: bytes, b: bytes) -> Iterator[Tuple[int, int]]:
+    """[start, end) runs, relative to the block, where two equal-length blocks differ."""
+    if np is not None:
+        neq = np.frombuffer(a, np.uint8) != np.frombuffer(b, np.uint8)
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], neq, [False])).view(np.int8)))
+        return zip(edges[0::2].tolist(), edges[1::2].tolist())
+    return (m.span() for m in _NONZERO_RUN.finditer(_xor(a, b)))
+
+def scan_regions(a, b, block: int = SCAN_BLOCK,
+                 progress: Optional[Callable[[int, int], None]] = None,
+                 cancel=None) -> DiffRegions:
+    """
+    Index the byte ranges where a and b differ at the same offset. Bytes
+    past the end of the shorter buffer count as one differing range.
+    progress(done, total) is called after each block; setting the
+    optional cancel Event stops the scan and returns what was found.
+    """
+    regions = DiffRegions()
+    common = min(len(a), len(b))
+    total = max(len(a), len(b))
+    for pos in range(0, common, block):
+        if cancel is not None and cancel.is_set():
+            return regions
+        end = min(pos + block, common)
+        x, y = a[pos:end], b[pos:end]
+        if x != y:
+            for s, e in _block_runs(x, y):
+                regions.add(pos + s, pos + e)
+        if progress is not None:
+            progress(end, total)
+    if total > common:
+        regions.add(common, total)
+    if progress is not None:
+        progress(total, total)
+    return regions
+
+def iter_file_regions(path_a: str, path_b: str, block: int = SCAN_BLOCK) -> Iterator[Tuple[int, int]]:
+    """
+    scan_regions over two files read block by block: yields the same
+    [start, end) ranges without mapping or holding the files.
+    """
+    with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+        total = max(os.fstat(fa.fileno()).st_size, os.fstat(fb.fileno()).st_size)
+        pos = 0
+        cur = None
+        while True:
+            x, y = fa.read(block), fb.read(block)
+            n = min(len(x), len(y))
+            if n == 0:
+                break
+            if n < block:
+                x, y = x[:n], y[:n]
+            if x != y:
+                for s, e in _block_runs(x, y):
+                    if cur is not None and cur[1] == pos + s:
+                        cur = (cur[0], pos + e)
+                    else:
+                        if cur is not None:
+                            yield cur
+                        cur = (pos + s, pos + e)
+            pos += n
+        if total > pos:
+            if cur is not None and cur[1] == pos:
+                cur = (cur[0], total)
+            else:
+                if cur is not None:
+                    yield cur
+                cur = (pos, total)
+        if cur is not None:
+            yield cur
+
+def hex_cells(chunk: bytes) -> str:
+    """'DE AD BE EF': same text as joining f"{b:02X}", without a per-byte loop."""
+    return chunk.hex(" ").upper()
+
+def ascii_cells(chunk: bytes) -> str:
+    return chunk.translate(_ASCII).decode("ascii")
+
+def diff_marks(x: bytes, y: bytes) -> str:
+    """'^^' under every hex cell of x that differs from y, aligned with hex_cells."""
+    n = min(len(x), len(y))
+    marks = _xor(x, y).translate(_NONZERO_FF).hex(" ").translate(_MARKS)
+    extra = max(len(x), len(y)) - n
+    if extra:
+        marks = " ".join(filter(None, (marks, " ".join(["^^"] * extra))))
+    return marks.rstrip()
+
+def diff_runs(x: bytes, y: bytes) -> List[Tuple[int, int]]:
+    """[start, end) byte runs of one hex row where x and y differ."""
+    runs = [m.span() for m in _NONZERO_RUN.finditer(_xor(x, y))]
+    n = min(len(x), len(y))
+    if max(len(x), len(y)) > n:
+        if runs and runs[-1][1] == n:
+            runs[-1] = (runs[-1][0], max(len(x), len(y)))
+        else:
+            runs.append((n, max(len(x), len(y))))
+    return runs
+
+def _read_rows(fa, fb, r0: int, r1: int, bpr: int, tag: str):
+    """(tag, offset, left bytes, right bytes) for rows r0..r1-1, read in bounded chunks."""
+    step = max(ROW_READ // bpr, 1)
+    for r in range(r0, r1, step):
+        n = min(step, r1 - r) * bpr
+        fa.seek(r * bpr)
+        fb.seek(r * bpr)
+        xa, xb = fa.read(n), fb.read(n)
+        for k in range(0, n, bpr):
+            yield tag, r * bpr + k, xa[k:k + bpr], xb[k:k + bpr]
+
+def iter_hex_rows(path_a: str, path_b: str, regions: Iterable[Tuple[int, int]],
+                  bytes_per_row: int = 16, context: int = 0) -> Iterator[tuple]:
+    """
+    Stream the hex rows of two files that hold a byte of `regions`
+    (sorted, e.g. from iter_file_regions) as ('!', offset, left, right),
+    with up to `context` unchanged rows around them as (' ', ...). Each
+    run of skipped rows becomes one ('...', row count, None, None).
+    """
+    bpr = bytes_per_row
+    with open(path_a, "rb") as fa, open(path_b, "rb") as fb:
+        size = max(os.fstat(fa.fileno()).st_size, os.fstat(fb.fileno()).st_size)
+        nrows = -(-size // bpr)
+        done = trail = 0            # rows before `done` are written or skipped
+        span = None                 # pending run of rows that hold a difference
+
+        def flush(d0, d1):
+            nonlocal done, trail
+            if trail > done:        # context after the previous change
+                end = min(trail, d0)
+                yield from _read_rows(fa, fb, done, end, bpr, " ")
+                done = end
+            start = max(d0 - context, done)
+            if start > done:
+                yield "...", start - done, None, None
+            yield from _read_rows(fa, fb, start, d0, bpr, " ")
+            yield from _read_rows(fa, fb, d0, d1, bpr, "!")
+            done = d1
+            trail = min(d1 + context, nrows)
+
+        for s, e in regions:
+            r0, r1 = s // bpr, (e - 1) // bpr + 1
+            if span is not None and r0 <= span[1]:
+                span = (span[0], max(span[1], r1))
+                continue
+            if span is not None:
+                yield from flush(*span)
+            span = (r0, r1)
+        if span is not None:
+            yield from flush(*span)
+        if trail > done:
+            yield from _read_rows(fa, fb, done, trail, bpr, " ")
+            done = trail
+        if nrows > done:
+            yield "...", nrows - done, None, None
+
+def iter_hex_text(rows: Iterable[tuple], bytes_per_row: int = 16) -> Iterator[str]:
+    """Text lines for iter_hex_rows: '-'/'+' lines per differing row with '^^' marks below."""
+    width = 3 * bytes_per_row - 1
+    pad = " " * 11
+    for tag, off, x, y in rows:
+        if tag == "...":
+            yield f"... {off} equal rows\n"
+        elif tag == " ":
+            yield f"{off:08X}   {hex_cells(x):<{width}}  |{ascii_cells(x)}|\n"
+        else:
+            yield f"{off:08X} - {hex_cells(x):<{width}}  |{ascii_cells(x)}|\n"
+            yield f"{off:08X} + {hex_cells(y):<{width}}  |{ascii_cells(y)}|\n"
+            yield f"{pad}{diff_marks(x, y)}\n"
+
+def _html_cells(text: str, spans, scale: int) -> str:
+    """Escape one hex or ASCII cell string, wrapping byte runs in span.chg."""
+    parts, pos = [], 0
+    for s, e in spans:
+        s, e = s * scale, e * scale - (scale > 1)
+        if s >= len(text):
+            break
+        parts.append(escape(text[pos:s], quote=False))
+        parts.append(f"<span class='chg'>{escape(text[s:e], quote=False)}</span>")
+        pos = e
+    parts.append(escape(text[pos:], quote=False))
+    return "".join(parts)
+
+def iter_hex_html_rows(rows: Iterable[tuple], bytes_per_row: int = 16) -> Iterator[str]:
+    """HTML table rows for iter_hex_rows, styled like the text diff report."""
+    width = 3 * bytes_per_row - 1
+    for tag, off, x, y in rows:
+        if tag == "...":
+            yield f"<tr class='skip'><td class='tag'>&hellip;</td><td class='txt'>{off} equal rows</td></tr>\n"
+            continue
+        if tag == " ":
+            yield (f"<tr class='equal'><td class='tag'> </td><td class='txt'>{off:08X}  "
+                   f"{hex_cells(x):<{width}}  {escape(ascii_cells(x), quote=False)}</td></tr>\n")
+            continue
+        runs = diff_runs(x, y)
+        for cls, sign, data in (("del", "-", x), ("ins", "+", y)):
+            hx = hex_cells(data)
+            yield (f"<tr class='{cls}'><td class='tag'>{sign}</td><td class='txt'>{off:08X}  "
+                   f"{_html_cells(hx, runs, 3)}{' ' * (width - len(hx))}  "
+                   f"{_html_cells(ascii_cells(data), runs, 1)}</td></tr>\n")
+
+def _weak(window: bytes) -> Tuple[int, int]:
+    """Adler-32 of a window split into its two sums, so it can be rolled."""
+    adler = zlib.adler32(window)
+    return adler & 0xFFFF, adler >> 16
+
+def _common_prefix(a, i: int, b, j: int, n: int) -> int:
+    """Length of the common prefix of a[i:i+n] and b[j:j+n], by doubling memcmp steps."""
+    p, step = 0, 64
+    while p < n:
+        s = min(step, n - p)
+        if a[i + p:i + p + s] == b[j + p:j + p + s]:
+            p += s
+            step *= 2
+        elif s <= 64:
+            break
+        else:
+            step = s // 2
+    while p < n and a[i + p] == b[j + p]:
+        p += 1
+    return p
+
+def _common_suffix(a, i: int, b, j: int, n: int) -> int:
+    """Length of the common suffix of a[i-n:i] and b[j-n:j]."""
+    p, step = 0, 64
+    while p < n:
+        s = min(step, n - p)
+        if a[i - p - s:i - p] == b[j - p - s:j - p]:
+            p += s
+            step *= 2
+        elif s <= 64:
+            break
+        else:
+            step = s // 2
+    while p < n and a[i - p - 1] == b[j - p - 1]:
+        p += 1
+    return p
+
+def _add_hunk(hunks: List[Hunk], tag: str, i1: int, i2: int, j1: int, j2: int):
+    if i1 == i2 and j1 == j2:
+        return
+    last = hunks[-1] if hunks else None
+    if last is not None and last.tag == tag == "equal" and last.a_end == i1 and last.b_end == j1:
+        last.a_end, last.b_end = i2, j2
+    else:
+        hunks.append(Hunk(tag, i1, i2, j1, j2))
+
+def _add_gap(hunks: List[Hunk], a, i1: int, i2: int, b, j1: int, j2: int):
+    """Unmatched a[i1:i2] / b[j1:j2]: equal prefix, the changed middle, equal suffix."""
+    pre = _common_prefix(a, i1, b, j1, min(i2 - i1, j2 - j1))
+    _add_hunk(hunks, "equal", i1, i1 + pre, j1, j1 + pre)
+    i1 += pre
+    j1 += pre
+    suf = _common_suffix(a, i2, b, j2, min(i2 - i1, j2 - j1))
+    i2 -= suf
+    j2 -= suf
+    if i1 < i2 or j1 < j2:
+        tag = "replace" if (i1 < i2 and j1 < j2) else ("delete" if i1 < i2 else "insert")
+        _add_hunk(hunks, tag, i1, i2, j1, j2)
+    _add_hunk(hunks, "equal", i2, i2 + suf, j2, j2 + suf)
+
+def align_block_size(size: int) -> int:
+    """Block size for align: about the square root of the left size, as rsync does."""
+    return min(max(math.isqrt(size), MIN_ALIGN_BLOCK), MAX_ALIGN_BLOCK)
+
+def align(a, b, block: Optional[int] = None,
+          progress: Optional[Callable[[int, int], None]] = None, cancel=None) -> List[Hunk]:
+    """
+    Insertion/deletion-aware alignment of two buffers as byte-range Hunks.
+    Matches keep their order (a block moved backwards shows up as a
+    delete plus an insert). Only blocks that occur once in a can anchor
+    a jump ahead in a; repeated ones (zero padding, fill patterns) would
+    match far from where they belong, so they only match at the next
+    block in a. progress(done, total) follows the position in b; setting the
+    optional cancel Event returns an empty list.
+    """
+    la, lb = len(a), len(b)
+    n = block or align_block_size(la)
+    keys = []                   # per block: (adler32, crc32), a cheap content key
+    for k in range(la // n):
+        blk = a[k * n:(k + 1) * n]
+        keys.append((zlib.adler32(blk), zlib.crc32(blk)))
+    copies = Counter(keys)
+    index = {}                  # adler32 -> blocks that occur once in a
+    for k, key in enumerate(keys):
+        if copies[key] == 1:
+            index.setdefault(key[0], []).append(k)
+
+    hunks: List[Hunk] = []
+    ia = ib = 0                 # end of the last match in a and b
+    next_k = 0                  # first left block after the last match
+    j = 0
+    s1 = None
+    report_at = _PROGRESS_STEP
+    while j + n <= lb:
+        if j >= report_at:
+            if cancel is not None and cancel.is_set():
+                return []
+            if progress is not None:
+                progress(j, lb)
+            report_at = j + _PROGRESS_STEP
+        k = None
+        if j == ib and (next_k + 1) * n <= la and a[next_k * n:(next_k + 1) * n] == b[j:j + n]:
+            k = next_k          # an equal stretch continues
+        else:
+            if s1 is None:
+                s1, s2 = _weak(b[j:j + n])
+            weak = s1 | (s2 << 16)
+            if next_k < len(keys) and keys[next_k][0] == weak and a[next_k * n:(next_k + 1) * n] == b[j:j + n]:
+                k = next_k      # resumes in place after a gap, even on a repeated block
+            else:
+                cands = index.get(weak)
+                if cands:
+                    window = b[j:j + n]
+                    for c in cands[bisect_left(cands, next_k):]:
+                        if a[c * n:(c + 1) * n] == window:
+                            k = c
+                            break
+            if k is None:
+                if j + n < lb:
+                    out = b[j]
+                    s1 = (s1 - out + b[j + n]) % _ADLER_MOD
+                    s2 = (s2 - n * out + s1 - 1) % _ADLER_MOD
+                j += 1
+                continue
+        _add_gap(hunks, a, ia, k * n, b, ib, j)
+        _add_hunk(hunks, "equal", k * n, (k + 1) * n, j, j + n)
+        ia, ib = (k + 1) * n, j + n
+        next_k = k + 1
+        j = ib
+        s1 = None
+    _add_gap(hunks, a, ia, la, b, ib, lb)
+    if progress is not None:
+        progress(lb, lb)
+    return hunks
+
+class RowLayout:
+    """
+    Side-by-side hex rows over a list of Hunks: every hunk starts a new
+    row and takes ceil(max(len a, len b) / bytes_per_row) rows. Equal
+    offsets (no alignment) are the single hunk from RowLayout.plain.
+    """
+
+    def __init__(self, hunks: List[Hunk], bytes_per_row: int):
+        self.hunks = hunks
+        self.bpr = bytes_per_row
+        self.row_starts = array("q")
+        rows = 0
+        for h in hunks:
+            self.row_starts.append(rows)
+            rows += -(-max(h.a_end - h.a_start, h.b_end - h.b_start) // bytes_per_row)
+        self.rows = rows
+
+    @classmethod
+    def plain(cls, size_a: int, size_b: int, bytes_per_row: int) -> "RowLayout":
+        return cls([Hunk("replace", 0, size_a, 0, size_b)], bytes_per_row)
+
+    def row(self, r: int) -> Tuple[str, int, int, int, int]:
+        """(tag, a offset, a byte count, b offset, b byte count) of display row r."""
+        k = bisect_right(self.row_starts, r) - 1
+        h = self.hunks[k]
+        d = (r - self.row_starts[k]) * self.bpr
+        a0, b0 = h.a_start + d, h.b_start + d
+        return (h.tag, a0, max(0, min(self.bpr, h.a_end - a0)),
+                b0, max(0, min(self.bpr, h.b_end - b0)))
+
+    def row_of(self, offset: int, side: int = 0) -> int:
+        """Display row holding byte `offset` of side 0 (a) or 1 (b)."""
+        ends = [h.a_end if side == 0 else h.b_end for h in self.hunks]
+        k = bisect_right(ends, offset)
+        if k == len(self.hunks):
+            return max(self.rows - 1, 0)
+        start = self.hunks[k].a_start if side == 0 else self.hunks[k].b_start
+        return self.row_starts[k] + (offset - start) // self.bpr
+
+    def diff_rows(self) -> DiffRegions:
+        """Display rows covered by non-equal hunks."""
+        rows = DiffRegions()
+        for k, h in enumerate(self.hunks):
+            if h.tag != "equal":
+                end = self.row_starts[k + 1] if k + 1 < len(self.hunks) else self.rows
+                rows.add(self.row_starts[k], end)
+        return rows
+
+def regions_to_rows(regions: DiffRegions, bytes_per_row: int) -> DiffRegions:
+    """Display rows of a plain (equal offset) layout touched by byte regions."""
+    rows = DiffRegions()
+    for start, end in regions:
+        rows.add(start // bytes_per_row, (end - 1) // bytes_per_row + 1)
+    return rows
@@ -1,88 +1,635 @@
-from typing import List, Tuple
+import re
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from html import escape
+from typing import Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
 
-def myers_diff(a: List[str], b: List[str]) -> List[Tuple[str, str]]:
+class DiffBudget:
     """
-    Return a list of tuples (tag, text) where tag in (' ', '-', '+')
-    ' ' = equal, '-' = deletion from a, '+' = insertion from b
-    Based on the O(ND) Myers algorithm (simplified, line-based).
+    Limits for a single diff. `max_cost` caps the edit distance the Myers
+    search may explore in any one range and `timeout` is a wall-clock budget
+    in seconds, counted from the start of the diff. Ranges that run out are
+    diffed approximately and `approximate` is set; `timed_out` tells that
+    the deadline (which depends on machine load) was hit.
+    """
+    __slots__ = ("max_cost", "timeout", "deadline", "approximate", "timed_out")
+
+    def __init__(self, max_cost: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_cost = max_cost
+        self.timeout = timeout
+        self.deadline = None
+        self.approximate = False
+        self.timed_out = False
+
+    def start(self) -> None:
+        self.approximate = False
+        self.timed_out = False
+        self.deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+    def exhausted(self, cost: int) -> bool:
+        if self.max_cost is not None and cost > self.max_cost:
+            return True
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+def _middle_snake(a, alo, ahi, b, blo, bhi, budget=None):
+    """
+    Find the middle snake of the shortest edit path between a[alo:ahi] and
+    b[blo:bhi] by running the forward and reverse searches towards each other.
+    Returns (x, y, u, v) in absolute indices: the snake runs from (x, y) to (u, v).
+    Only two V arrays of size O(N+M) are kept, no per-step snapshots.
+    Returns None if `budget` runs out first.
     """
-    N, M = len(a), len(b)
-    maxd = N + M
-    v = {1: 0}
-    trace = []
+    n, m = ahi - alo, bhi - blo
+    delta = n - m
+    odd = delta & 1
+    maxd = (n + m + 1) // 2
+    off = maxd + 1
+    vf = [0] * (2 * off + 1)
+    vb = [0] * (2 * off + 1)
 
     for d in range(0, maxd + 1):
-        v_snapshot = v.copy()
-        trace.append(v_snapshot)
+        if budget is not None and budget.exhausted(2 * d):
+            return None
+        # forward search, diagonals k = x - y
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[off + k - 1] < vf[off + k + 1]):
+                x = vf[off + k + 1]
+            else:
+                x = vf[off + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            vf[off + k] = x
+            if odd and delta - (d - 1) <= k <= delta + (d - 1):
+                if x + vb[off + delta - k] >= n:
+                    return alo + x0, blo + y0, alo + x, blo + y
+        # reverse search, in coordinates measured from the ends
         for k in range(-d, d + 1, 2):
-            if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
-                x = v.get(k + 1, 0)
+            if k == -d or (k != d and vb[off + k - 1] < vb[off + k + 1]):
+                x = vb[off + k + 1]
             else:
-                x = v.get(k - 1, 0) + 1
+                x = vb[off + k - 1] + 1
             y = x - k
-            while x < N and y < M and a[x] == b[y]:
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
                 x += 1
                 y += 1
-            v[k] = x
-            if x >= N and y >= M:
-                break
+            vb[off + k] = x
+            if not odd and -d <= delta - k <= d:
+                if x + vf[off + delta - k] >= n:
+                    return ahi - x, bhi - y, ahi - x0, bhi - y0
+    raise AssertionError("middle snake not found")
+
+def _add_block(blocks, i, j, size):
+    if not size:
+        return
+    if blocks:
+        pi, pj, psize = blocks[-1]
+        if pi + psize == i and pj + psize == j:
+            blocks[-1] = (pi, pj, psize + size)
+            return
+    blocks.append((i, j, size))
+
+def _trim(a, alo, ahi, b, blo, bhi):
+    """Return (head, tail): the lengths of the common head and tail of a range."""
+    head = 0
+    while alo + head < ahi and blo + head < bhi and a[alo + head] == b[blo + head]:
+        head += 1
+    alo += head
+    blo += head
+    tail = 0
+    while alo < ahi - tail and blo < bhi - tail and a[ahi - 1 - tail] == b[bhi - 1 - tail]:
+        tail += 1
+    return head, tail
+
+def _diff_range(a, alo, ahi, b, blo, bhi, blocks, budget=None):
+    """
+    Append the matching blocks (i, j, size) of a[alo:ahi] vs b[blo:bhi]
+    to `blocks`, in order.
+    """
+    # trim the common head and tail of this range first; this also
+    # guarantees every split below strictly shrinks the problem
+    head, tail = _trim(a, alo, ahi, b, blo, bhi)
+    _add_block(blocks, alo, blo, head)
+    alo += head
+    blo += head
+    ahi -= tail
+    bhi -= tail
+
+    if alo < ahi and blo < bhi:
+        snake = _middle_snake(a, alo, ahi, b, blo, bhi, budget)
+        if snake is None:
+            budget.approximate = True
+            _approx_range(a, alo, ahi, b, blo, bhi, blocks)
         else:
+            x, y, u, v = snake
+            _diff_range(a, alo, x, b, blo, y, blocks, budget)
+            _add_block(blocks, x, y, u - x)
+            _diff_range(a, u, ahi, b, v, bhi, blocks, budget)
+
+    _add_block(blocks, ahi, bhi, tail)
+
+APPROX_EXACT_LINES = 64
+
+def _approx_range(a, alo, ahi, b, blo, bhi, blocks):
+    """
+    Non-minimal fallback for ranges that blew the budget: split once on the
+    patience anchors, diff gaps of up to APPROX_EXACT_LINES lines per side
+    exactly and report larger gaps as a plain replacement. Runs in
+    O(n log n) whatever the edit distance is.
+    """
+    parts = _patience_split(a, alo, ahi, b, blo, bhi) or [(alo, ahi, blo, bhi)]
+    for part in parts:
+        if len(part) == 3:
+            _add_block(blocks, *part)
             continue
-        break
-
-    # backtrack
-    res = []
-    x, y = N, M
-    for d in range(len(trace) - 1, -1, -1):
-        v = trace[d]
-        k = x - y
-        if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
-            pk = k + 1
-        else:
-            pk = k - 1
-        px = v.get(pk, 0)
-        py = px - pk
-        while x > px and y > py:
-            res.append((' ', a[x - 1]))
-            x -= 1
-            y -= 1
-        if d == 0:
-            break
-        if x == px:
-            res.append(('+', b[y - 1]))
-            y -= 1
+        plo, phi, qlo, qhi = part
+        head, tail = _trim(a, plo, phi, b, qlo, qhi)
+        _add_block(blocks, plo, qlo, head)
+        plo += head
+        qlo += head
+        phi -= tail
+        qhi -= tail
+        if phi - plo <= APPROX_EXACT_LINES and qhi - qlo <= APPROX_EXACT_LINES:
+            _diff_range(a, plo, phi, b, qlo, qhi, blocks)
+        _add_block(blocks, phi, qhi, tail)
+
+def _patience_split(a, alo, ahi, b, blo, bhi):
+    """
+    Anchor on lines that occur exactly once on each side, keeping the
+    longest run of them that appears in the same order on both sides.
+    Returns the ranges between anchors interleaved with the anchors
+    themselves, or None when there is nothing unique to anchor on.
+    """
+    seen_a = {}
+    for i in range(alo, ahi):
+        line = a[i]
+        seen_a[line] = -1 if line in seen_a else i
+    seen_b = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if seen_a.get(line, -1) >= 0:
+            seen_b[line] = -1 if line in seen_b else j
+
+    # longest increasing subsequence of a-positions, in b order
+    pairs = [(seen_a[line], j) for line, j in seen_b.items() if j >= 0]
+    pairs.sort(key=lambda p: p[1])
+    tails = []
+    back = [-1] * len(pairs)
+    tops = []
+    for idx, (i, _) in enumerate(pairs):
+        pos = bisect_left(tails, i)
+        if pos == len(tails):
+            tails.append(i)
+            tops.append(idx)
         else:
-            res.append(('-', a[x - 1]))
-            x -= 1
+            tails[pos] = i
+            tops[pos] = idx
+        back[idx] = tops[pos - 1] if pos else -1
+    if not tops:
+        return None
+    anchors = []
+    idx = tops[-1]
+    while idx >= 0:
+        anchors.append(pairs[idx])
+        idx = back[idx]
+    anchors.reverse()
 
-    res.reverse()
-    return res
+    parts = []
+    i, j = alo, blo
+    for ai, bj in anchors:
+        parts.append((i, ai, j, bj))
+        parts.append((ai, bj, 1))
+        i, j = ai + 1, bj + 1
+    parts.append((i, ahi, j, bhi))
+    return parts
 
-def diff_as_html(a_text: str, b_text: str) -> str:
-    a = a_text.splitlines()
-    b = b_text.splitlines()
-    hunks = myers_diff(a, b)
-    rows = []
-    for tag, line in hunks:
-        if tag == ' ':
-            cls = "equal"
-        elif tag == '-':
-            cls = "del"
+HISTOGRAM_MAX_CHAIN = 64
+
+def _histogram_split(a, alo, ahi, b, blo, bhi):
+    """
+    Histogram diff as in git: index the occurrences of each line of a, then
+    pick the common region whose rarest line occurs least often on the left
+    (preferring longer regions on ties, then the one nearest the middle of
+    the range, so that edits spread evenly over many lines still split the
+    range in halves instead of peeling off one line at a time). Returns
+    [before, region, after], or None when every candidate line is too
+    common to be a useful anchor.
+    """
+    occ = {}
+    for i in range(alo, ahi):
+        occ.setdefault(a[i], []).append(i)
+
+    best = None
+    best_count = HISTOGRAM_MAX_CHAIN + 1
+    best_off = 0
+    mid = alo + ahi + blo + bhi
+    j = blo
+    while j < bhi:
+        positions = occ.get(b[j])
+        if positions is None or len(positions) > best_count:
+            j += 1
+            continue
+        next_j = j + 1
+        for i in positions:
+            sa, sb, count = i, j, len(positions)
+            while sa > alo and sb > blo and a[sa - 1] == b[sb - 1]:
+                sa -= 1
+                sb -= 1
+                count = min(count, len(occ[a[sa]]))
+            ea, eb = i + 1, j + 1
+            while ea < ahi and eb < bhi and a[ea] == b[eb]:
+                count = min(count, len(occ[a[ea]]))
+                ea += 1
+                eb += 1
+            next_j = max(next_j, eb)
+            off = abs(sa + ea + sb + eb - mid)     # twice the distance from the middle
+            if (best is None or count < best_count
+                    or (count == best_count and (ea - sa, -off) > (best[2], -best_off))):
+                best = (sa, sb, ea - sa)
+                best_count = count
+                best_off = off
+        j = next_j
+
+    if best is None:
+        return None
+    sa, sb, size = best
+    return [(alo, sa, blo, sb), best, (sa + size, ahi, sb + size, bhi)]
+
+_SPLITTERS = {
+    "patience": _patience_split,
+    "histogram": _histogram_split,
+}
+
+def _split_ranges(split, a, alo, ahi, b, blo, bhi, blocks, budget=None):
+    """
+    Drive an anchor-based splitter over a[alo:ahi] vs b[blo:bhi] with an
+    explicit stack, so deep splits cannot hit the recursion limit. Ranges
+    the splitter cannot anchor are handed to the Myers core. Once `budget`
+    is exhausted, the ranges still left are diffed approximately.
+    """
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        item = stack.pop()
+        if len(item) == 3:
+            _add_block(blocks, *item)
+            continue
+        alo, ahi, blo, bhi = item
+        head, tail = _trim(a, alo, ahi, b, blo, bhi)
+        _add_block(blocks, alo, blo, head)
+        alo += head
+        blo += head
+        ahi -= tail
+        bhi -= tail
+        parts = None
+        if alo < ahi and blo < bhi and budget is not None and budget.exhausted(0):
+            budget.approximate = True
+            _approx_range(a, alo, ahi, b, blo, bhi, blocks)
+        elif alo < ahi and blo < bhi:
+            parts = split(a, alo, ahi, b, blo, bhi)
+            if parts is None:
+                _diff_range(a, alo, ahi, b, blo, bhi, blocks, budget)
+        if parts is None:
+            _add_block(blocks, ahi, bhi, tail)
         else:
-            cls = "ins"
-        rows.append(f"<tr class='{cls}'><td class='tag'>{tag}</td><td class='txt'>{line}</td></tr>")
-    html = f"""<!doctype html>
+            stack.append((ahi, bhi, tail))
+            stack.extend(reversed(parts))
+
+DIFF_ALGORITHMS = ("myers", "patience", "histogram")
+
+APPROX_NOTICE = "Approximate diff: the exact diff exceeded its time/cost budget, so changes may not be minimal."
+
+def _intern_lines(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """
+    Map every distinct line to a small integer so the snake loops compare
+    ints instead of strings. Plain lists are used rather than array('i'):
+    indexing an array boxes a new int on every access, which costs more
+    than the string compare it replaces.
+    """
+    ids = {}
+    ia = [ids.setdefault(line, len(ids)) for line in a]
+    ib = [ids.setdefault(line, len(ids)) for line in b]
+    return ia, ib
+
+def matching_blocks(a: Sequence[str], b: Sequence[str], algorithm: str = "myers",
+                    budget: Optional[DiffBudget] = None) -> List[Tuple[int, int, int]]:
+    """
+    Return the (i, j, size) runs where a[i:i+size] == b[j:j+size], in order.
+    The shared head and tail are stripped before the remaining lines are
+    interned and handed to the chosen algorithm (see DIFF_ALGORITHMS).
+    With a `budget`, check `budget.approximate` afterwards to see whether
+    the result is still a shortest edit script.
+    """
+    if algorithm not in DIFF_ALGORITHMS:
+        raise ValueError(f"unknown diff algorithm: {algorithm!r}")
+    if budget is not None:
+        budget.start()
+    n, m = len(a), len(b)
+    pre = 0
+    while pre < n and pre < m and a[pre] == b[pre]:
+        pre += 1
+    suf = 0
+    while suf < n - pre and suf < m - pre and a[n - 1 - suf] == b[m - 1 - suf]:
+        suf += 1
+
+    blocks = []
+    _add_block(blocks, 0, 0, pre)
+    ia, ib = _intern_lines(a[pre:n - suf], b[pre:m - suf])
+    mid = []
+    if algorithm == "myers":
+        _diff_range(ia, 0, len(ia), ib, 0, len(ib), mid, budget)
+    else:
+        _split_ranges(_SPLITTERS[algorithm], ia, 0, len(ia), ib, 0, len(ib), mid, budget)
+    for i, j, size in mid:
+        _add_block(blocks, pre + i, pre + j, size)
+    _add_block(blocks, n - suf, m - suf, suf)
+    return blocks
+
+class Hunk:
+    """
+    One run of the edit script as index ranges into the compared sequences:
+    a[a_start:a_end] vs b[b_start:b_end]. `tag` is 'equal', 'delete',
+    'insert' or 'replace'.
+    """
+    __slots__ = ("tag", "a_start", "a_end", "b_start", "b_end")
+
+    def __init__(self, tag: str, a_start: int, a_end: int, b_start: int, b_end: int):
+        self.tag = tag
+        self.a_start = a_start
+        self.a_end = a_end
+        self.b_start = b_start
+        self.b_end = b_end
+
+    def __iter__(self):
+        return iter((self.tag, self.a_start, self.a_end, self.b_start, self.b_end))
+
+    def __eq__(self, other):
+        return isinstance(other, Hunk) and tuple(self) == tuple(other)
+
+    def __repr__(self):
+        return f"Hunk({self.tag!r}, {self.a_start}, {self.a_end}, {self.b_start}, {self.b_end})"
+
+class DiffResult:
+    """
+    Hunk-based diff of two line sequences. Hunks only hold indices into
+    `a` and `b`; the row iterators below produce text lazily.
+    """
+    __slots__ = ("a", "b", "hunks", "approximate")
+
+    def __init__(self, a: Sequence[str], b: Sequence[str], hunks: List[Hunk], approximate: bool = False):
+        self.a = a
+        self.b = b
+        self.hunks = hunks
+        self.approximate = approximate
+
+    def __iter__(self):
+        return iter(self.hunks)
+
+    def __len__(self):
+        return len(self.hunks)
+
+    def changes(self) -> Iterator[Hunk]:
+        return (h for h in self.hunks if h.tag != 'equal')
+
+    def rows(self) -> Iterator[Tuple[str, str]]:
+        """Yield (tag, text) with tag in (' ', '-', '+'), deletions before insertions."""
+        a, b = self.a, self.b
+        for h in self.hunks:
+            if h.tag == 'equal':
+                for x in range(h.a_start, h.a_end):
+                    yield ' ', a[x]
+                continue
+            for x in range(h.a_start, h.a_end):
+                yield '-', a[x]
+            for y in range(h.b_start, h.b_end):
+                yield '+', b[y]
+
+    def aligned_rows(self) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+        """
+        Yield side-by-side rows (tag, left, right) where the missing side is
+        None. Lines of a 'replace' hunk are paired up row by row.
+        """
+        a, b = self.a, self.b
+        for h in self.hunks:
+            na = h.a_end - h.a_start
+            nb = h.b_end - h.b_start
+            for k in range(max(na, nb)):
+                yield (h.tag,
+                       a[h.a_start + k] if k < na else None,
+                       b[h.b_start + k] if k < nb else None)
+
+def _hunks_from_blocks(blocks, n: int, m: int) -> List[Hunk]:
+    hunks = []
+    i = j = 0
+    for bi, bj, size in blocks + [(n, m, 0)]:
+        if i < bi or j < bj:
+            tag = 'replace' if (i < bi and j < bj) else ('delete' if i < bi else 'insert')
+            hunks.append(Hunk(tag, i, bi, j, bj))
+        if size:
+            hunks.append(Hunk('equal', bi, bi + size, bj, bj + size))
+        i, j = bi + size, bj + size
+    return hunks
+
+def compute_diff(a: Sequence[str], b: Sequence[str], algorithm: str = "myers",
+                 budget: Optional[DiffBudget] = None, cache=None) -> DiffResult:
+    """
+    Diff two line sequences and return a DiffResult. `algorithm` is one of
+    DIFF_ALGORITHMS; see matching_blocks for `budget`. `cache` is an
+    optional store with key()/get()/put() such as diff_cache.DiffCache;
+    it holds the matching blocks, so a hit skips the diff entirely.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key(a, b, algorithm, budget)
+        hit = cache.get(key)
+        if hit is not None:
+            blocks, approximate = hit
+            return DiffResult(a, b, _hunks_from_blocks(blocks, len(a), len(b)), approximate)
+    blocks = matching_blocks(a, b, algorithm, budget)
+    approximate = budget is not None and budget.approximate
+    # a diff cut short by the clock might finish next time, so it is not kept
+    if cache is not None and not (budget is not None and budget.timed_out):
+        cache.put(key, blocks, approximate)
+    return DiffResult(a, b, _hunks_from_blocks(blocks, len(a), len(b)), approximate)
+
+def diff_lines(a: List[str], b: List[str], algorithm: str = "myers",
+               budget: Optional[DiffBudget] = None) -> List[Tuple[str, str]]:
+    """
+    Return a list of tuples (tag, text) where tag in (' ', '-', '+')
+    ' ' = equal, '-' = deletion from a, '+' = insertion from b
+    Prefer compute_diff for large inputs; this materializes every row.
+    """
+    return list(compute_diff(a, b, algorithm, budget).rows())
+
+def myers_diff(a: List[str], b: List[str]) -> List[Tuple[str, str]]:
+    """
+    Return a list of tuples (tag, text) where tag in (' ', '-', '+')
+    ' ' = equal, '-' = deletion from a, '+' = insertion from b
+    Based on the O(ND) Myers algorithm, using the linear-space
+    divide-and-conquer (middle snake) refinement.
+    """
+    return diff_lines(a, b, "myers")
+
+INTRALINE_MODES = ("word", "char", "off")
+INTRALINE_MAX_TOKENS = 2000
+
+_TOKEN_RE = re.compile(r"\w+|\s+|[^\w\s]")
+
+@lru_cache(maxsize=4096)
+def intraline_spans(old: str, new: str, mode: str = "word"):
+    """
+    Second-level diff of one deleted/inserted line pair. Returns
+    (old_spans, new_spans), tuples of (start, end) character offsets that
+    changed, or None if, after the tokens both lines share at the start
+    and end are trimmed, either middle has more than INTRALINE_MAX_TOKENS
+    tokens. `mode` is 'word' or 'char'. Results are memoized per pair, so
+    an edit repeated across a file is only diffed once.
+    """
+    if mode == "char":
+        ta, tb = old, new
+    else:
+        ta, tb = _TOKEN_RE.findall(old), _TOKEN_RE.findall(new)
+    na, nb = len(ta), len(tb)
+    head = 0
+    while head < na and head < nb and ta[head] == tb[head]:
+        head += 1
+    tail = 0
+    while tail < na - head and tail < nb - head and ta[na - 1 - tail] == tb[nb - 1 - tail]:
+        tail += 1
+    ma, mb = ta[head:na - tail], tb[head:nb - tail]
+    if len(ma) > INTRALINE_MAX_TOKENS or len(mb) > INTRALINE_MAX_TOKENS:
+        return None
+    offs_a = [0]
+    for tok in ta[:na - tail]:
+        offs_a.append(offs_a[-1] + len(tok))
+    offs_b = [0]
+    for tok in tb[:nb - tail]:
+        offs_b.append(offs_b[-1] + len(tok))
+
+    spans_a, spans_b = [], []
+    i = j = 0
+    for bi, bj, size in matching_blocks(ma, mb) + [(len(ma), len(mb), 0)]:
+        if i < bi:
+            spans_a.append((offs_a[head + i], offs_a[head + bi]))
+        if j < bj:
+            spans_b.append((offs_b[head + j], offs_b[head + bj]))
+        i, j = bi + size, bj + size
+    return tuple(spans_a), tuple(spans_b)
+
+_HTML_HEAD = """<!doctype html>
 <html><head><meta charset="utf-8"><style>
-body {{ font-family: -apple-system, Segoe UI, Roboto, sans-serif; }}
-table {{ border-collapse: collapse; width: 100%; }}
-td {{ padding: 2px 6px; vertical-align: top; }}
-tr.equal {{ background: #f5f5f5; }}
-tr.del {{ background: #ffecec; }}
-tr.ins {{ background: #eaffea; }}
-td.tag {{ width: 24px; color: #888; }}
-td.txt {{ white-space: pre; }}
+body { font-family: -apple-system, Segoe UI, Roboto, sans-serif; }
+table { border-collapse: collapse; width: 100%; }
+td { padding: 2px 6px; vertical-align: top; }
+tr.equal { background: #f5f5f5; }
+tr.del { background: #ffecec; }
+tr.ins { background: #eaffea; }
+tr.skip { background: #e8eef7; color: #555; }
+td.tag { width: 24px; color: #888; }
+td.txt { white-space: pre; }
+tr.del span.chg { background: #ffb3b3; }
+tr.ins span.chg { background: #a8f0a8; }
+p.approx { background: #fff4cc; padding: 4px 6px; }
 </style></head><body>
-<h3>BC-Lite Diff</h3>
-<table>{''.join(rows)}</table>
+"""
+_HTML_TITLE = "<h3>BC-Lite Diff</h3>\n"
+_HTML_TAIL = """</table>
 </body></html>"""
-    return html
+_ROW_CLASS = {' ': "equal", '-': "del", '+': "ins"}
+
+def _html_row(tag: str, line: str, spans=None) -> str:
+    if spans:
+        parts = []
+        pos = 0
+        for start, end in spans:
+            parts.append(escape(line[pos:start], quote=False))
+            parts.append(f"<span class='chg'>{escape(line[start:end], quote=False)}</span>")
+            pos = end
+        parts.append(escape(line[pos:], quote=False))
+        text = "".join(parts)
+    else:
+        text = escape(line, quote=False)
+    return f"<tr class='{_ROW_CLASS[tag]}'><td class='tag'>{tag}</td><td class='txt'>{text}</td></tr>\n"
+
+def _html_skip(count: int) -> str:
+    return f"<tr class='skip'><td class='tag'>&hellip;</td><td class='txt'>{count} unchanged lines</td></tr>\n"
+
+def iter_html_report(result: DiffResult, context: Optional[int] = None,
+                     intraline: str = "word") -> Iterator[str]:
+    """
+    Yield the HTML report for `result` piece by piece. With `context`, runs
+    of unchanged lines are collapsed to that many lines around each change.
+    Paired lines of replace hunks get `intraline` highlighting (see
+    INTRALINE_MODES).
+    """
+    yield _HTML_HEAD
+    yield _HTML_TITLE
+    if result.approximate:
+        yield f"<p class='approx'>{APPROX_NOTICE}</p>\n"
+    yield "<table>\n"
+    yield from iter_html_rows(result, context, intraline)
+    yield _HTML_TAIL
+
+def iter_html_rows(result: DiffResult, context: Optional[int] = None,
+                   intraline: str = "word") -> Iterator[str]:
+    """The table rows of iter_html_report, without the page around them."""
+    a, b = result.a, result.b
+    hunks = result.hunks
+    last = len(hunks) - 1
+    for idx, h in enumerate(hunks):
+        if h.tag != 'equal':
+            pairs = 0
+            if h.tag == 'replace' and intraline != "off":
+                pairs = min(h.a_end - h.a_start, h.b_end - h.b_start)
+            for k in range(h.a_end - h.a_start):
+                spans = intraline_spans(a[h.a_start + k], b[h.b_start + k], intraline) if k < pairs else None
+                yield _html_row('-', a[h.a_start + k], spans and spans[0])
+            for k in range(h.b_end - h.b_start):
+                spans = intraline_spans(a[h.a_start + k], b[h.b_start + k], intraline) if k < pairs else None
+                yield _html_row('+', b[h.b_start + k], spans and spans[1])
+            continue
+        start, end = h.a_start, h.a_end
+        if context is None or context < 0:
+            keep_head, keep_tail = end - start, 0
+        else:
+            keep_head = context if idx > 0 else 0
+            keep_tail = context if idx < last else 0
+        if keep_head + keep_tail + 1 >= end - start:
+            keep_head, keep_tail = end - start, 0
+        for x in range(start, start + keep_head):
+            yield _html_row(' ', a[x])
+        skipped = end - start - keep_head - keep_tail
+        if skipped:
+            yield _html_skip(skipped)
+        for x in range(end - keep_tail, end):
+            yield _html_row(' ', a[x])
+
+def iter_html_sections(sections: Iterable[Tuple[str, Iterable[str]]],
+                       title: str = "BC-Lite Diff") -> Iterator[str]:
+    """
+    One HTML page holding several reports: `sections` yields (heading
+    HTML, table rows or other body HTML) pairs, each written as it comes.
+    """
+    yield _HTML_HEAD
+    yield f"<h3>{escape(title, quote=False)}</h3>\n"
+    for heading, body in sections:
+        yield f"<h4>{heading}</h4>\n"
+        yield from body
+    yield "</body></html>"
+
+def write_html_report(result: DiffResult, fp: TextIO, context: Optional[int] = None,
+                      intraline: str = "word") -> None:
+    """Stream the HTML report for `result` into the open text file `fp`."""
+    fp.writelines(iter_html_report(result, context, intraline))
+
+def diff_as_html(a_text: str, b_text: str, algorithm: str = "myers",
+                 budget: Optional[DiffBudget] = None, context: Optional[int] = None,
+                 intraline: str = "word") -> str:
+    a = a_text.splitlines()
+    b = b_text.splitlines()
+    return "".join(iter_html_report(compute_diff(a, b, algorithm, budget), context, intraline))
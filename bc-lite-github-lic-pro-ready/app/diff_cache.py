@@ -0,0 +1,129 @@
+"""
+On-disk cache of text diff results for BC-Lite.
+
+Entries are keyed by the content hashes of both sides plus the diff
+options, and store only the compact edit script (the matching blocks),
+so reopening the same pair of files skips the diff. The cache lives in
+CONFIG_DIR/diff-cache, survives restarts and is trimmed to a size cap by
+evicting the least recently used entries (file mtime is the LRU clock).
+"""
+import hashlib
+import os
+import struct
+from array import array
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    from .settings import CONFIG_DIR
+except ImportError:
+    from settings import CONFIG_DIR
+
+CACHE_DIR = CONFIG_DIR / "diff-cache"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_MAGIC = b"BCD1"
+_HEADER = struct.Struct("<4sBQ")   # magic, approximate flag, block count
+
+def _content_hash(lines: Sequence[str]) -> str:
+    h = hashlib.sha256()
+    h.update(str(len(lines)).encode("ascii") + b"\0")
+    h.update("\n".join(lines).encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+class DiffCache:
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def key(self, a: Sequence[str], b: Sequence[str], algorithm: str, budget=None) -> str:
+        opts = f"{algorithm}|{getattr(budget, 'max_cost', None)}|{getattr(budget, 'timeout', None)}"
+        h = hashlib.sha256()
+        for part in (_content_hash(a), _content_hash(b), opts):
+            h.update(part.encode("utf-8") + b"\0")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def get(self, key: str) -> Optional[Tuple[List[Tuple[int, int, int]], bool]]:
+        p = self._path(key)
+        try:
+            data = p.read_bytes()
+        except OSError:
+            return None
+        try:
+            magic, approximate, count = _HEADER.unpack_from(data)
+            if magic != _MAGIC:
+                raise ValueError("bad magic")
+            flat = array("q")
+            flat.frombytes(data[_HEADER.size:])
+            if len(flat) != 3 * count:
+                raise ValueError("truncated entry")
+        except (ValueError, struct.error):
+            p.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        blocks = [(flat[k], flat[k + 1], flat[k + 2]) for k in range(0, len(flat), 3)]
+        return blocks, bool(approximate)
+
+    def put(self, key: str, blocks: List[Tuple[int, int, int]], approximate: bool) -> None:
+        if self.max_bytes <= 0:
+            return
+        flat = array("q")
+        for block in blocks:
+            flat.extend(block)
+        data = _HEADER.pack(_MAGIC, int(approximate), len(blocks)) + flat.tobytes()
+        if len(data) > self.max_bytes:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            p = self._path(key)
+            tmp = p.with_suffix(f".tmp{os.getpid()}")
+            tmp.write_bytes(data)
+            os.replace(tmp, p)
+            self.evict()
+        except OSError:
+            pass
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if not e.name.endswith(".bin"):
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, e.path))
+                    total += st.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        try:
+            with os.scandir(self.directory) as it:
+                for e in it:
+                    if e.name.endswith(".bin"):
+                        os.unlink(e.path)
+        except OSError:
+            pass
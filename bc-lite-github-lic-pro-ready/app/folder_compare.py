@@ -1,6 +1,38 @@
-import os, hashlib
+import os, hashlib, mmap, threading
+from array import array
+from collections.abc import Sequence as SequenceABC
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional, Sequence
+
+try:
+    import xxhash   # optional, non-cryptographic but several times faster than SHA-256
+except ImportError:
+    xxhash = None
+
+DEFAULT_WALK_WORKERS = min(32, (os.cpu_count() or 4) * 2)
+DEFAULT_HASH_WORKERS = min(16, os.cpu_count() or 4)
+DEFAULT_HASH_INFLIGHT = 512 * 1024 * 1024   # bytes of files being hashed at once
+COMPARE_BLOCK = 1024 * 1024                 # block size of the 'bytes' compare mode
+MIN_HASH_BLOCK = 64 * 1024
+MAX_HASH_BLOCK = 4 * 1024 * 1024
+MMAP_THRESHOLD = 16 * 1024 * 1024           # files at least this big are hashed through mmap
+
+def _git_sha1(size: int):
+    # same digest as `git hash-object`: SHA-1 over a "blob <size>\0" header plus the data
+    h = hashlib.sha1()
+    h.update(b"blob %d\0" % size)
+    return h
+
+# name -> factory(file size) returning a hashlib-style object
+HASH_ALGORITHMS = {
+    "sha256": lambda size: hashlib.sha256(),
+    "blake2b": lambda size: hashlib.blake2b(),
+    "sha1": lambda size: hashlib.sha1(),
+    "git-sha1": _git_sha1,
+}
+if xxhash is not None:
+    HASH_ALGORITHMS["xxh3-128"] = lambda size: xxhash.xxh3_128()
 
 @dataclass
 class FileEntry:
@@ -10,59 +42,609 @@ class FileEntry:
     mtime: float
     hash: Optional[str] = None
 
-def walk(dirpath: str) -> List[FileEntry]:
-    out = []
-    dirpath = os.path.abspath(dirpath)
-    for root, _, files in os.walk(dirpath):
-        for f in files:
-            p = os.path.join(root, f)
+class _Chunk:
+    """The files of one directory, as parallel columns."""
+    __slots__ = ("rel", "names", "sizes", "mtimes")
+
+    def __init__(self, rel: str):
+        self.rel = rel
+        self.names = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+
+def _scan_dir(path: str, rel: str, path_filter=None):
+    """
+    List one directory with os.scandir. Returns (chunk, subdirs) where
+    subdirs are (path, rel) pairs still to be scanned. Like os.walk,
+    symlinked directories are not followed and unreadable ones are skipped.
+    A PathFilter prunes excluded directories here, before they are queued,
+    and drops excluded files before (name rules) or right after stat().
+    """
+    chunk, subdirs = _Chunk(rel), []
+    try:
+        it = os.scandir(path)
+    except OSError:
+        return chunk, subdirs
+    with it:
+        for e in it:
+            erel = e.name if not rel else rel + os.sep + e.name
             try:
-                st = os.stat(p)
-            except FileNotFoundError:
+                if e.is_dir():
+                    if not e.is_symlink() and not (path_filter and path_filter.excludes_dir(erel)):
+                        subdirs.append((e.path, erel))
+                    continue
+                if path_filter and path_filter.excludes_name(erel):
+                    continue
+                st = e.stat()
+            except OSError:
                 continue
-            rel = os.path.relpath(p, dirpath)
-            out.append(FileEntry(p, rel, st.st_size, st.st_mtime))
-    return out
+            if path_filter and path_filter.excludes_stat(st.st_size, st.st_mtime):
+                continue
+            chunk.names.append(e.name)
+            chunk.sizes.append(st.st_size)
+            chunk.mtimes.append(st.st_mtime)
+    return chunk, subdirs
 
-def hash_file(path: str, blocksize: int = 65536) -> str:
-    h = hashlib.sha256()
-    with open(path, "rb") as fp:
-        for chunk in iter(lambda: fp.read(blocksize), b""):
-            h.update(chunk)
-    return h.hexdigest()
+def _walk_chunks(dirpaths: Sequence[str], workers: Optional[int] = None,
+                 cancel: Optional[threading.Event] = None, path_filter=None,
+                 rel: str = "") -> List[List[_Chunk]]:
+    results = [[] for _ in dirpaths]
+    pool = ThreadPoolExecutor(max_workers=workers or DEFAULT_WALK_WORKERS)
+    try:
+        pending = {pool.submit(_scan_dir, os.path.join(os.path.abspath(d), rel), rel, path_filter): idx
+                   for idx, d in enumerate(dirpaths)}
+        while pending and not (cancel is not None and cancel.is_set()):
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                idx = pending.pop(fut)
+                chunk, subdirs = fut.result()
+                if chunk.names:
+                    results[idx].append(chunk)
+                for path, rel in subdirs:
+                    pending[pool.submit(_scan_dir, path, rel, path_filter)] = idx
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return results
 
-def compare_dirs(left: str, right: str, mode: str = "size_time", do_hash: bool = False):
+class EntryTable:
     """
-    mode: 'size_time' or 'content'
+    Columnar listing of one tree: a table of directory paths, and per
+    file a directory index, name, size and mtime, with no per-file object
+    and no absolute path string. Files are ordered by (directory, name),
+    the order the merge-join in compare_dirs relies on.
     """
-    la = {e.rel: e for e in walk(left)}
-    rb = {e.rel: e for e in walk(right)}
-    all_keys = sorted(set(la) | set(rb))
-    rows = []
-    for k in all_keys:
-        le = la.get(k)
-        re = rb.get(k)
-        status = ""
-        if le and not re:
-            status = "Left only"
-        elif re and not le:
-            status = "Right only"
+    __slots__ = ("root", "dirs", "dir_idx", "names", "sizes", "mtimes")
+
+    def __init__(self, root: str, chunks: Sequence[_Chunk] = ()):
+        self.root = os.path.abspath(root)
+        self.dirs = []
+        self.dir_idx = array("I")
+        self.names = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        for chunk in sorted(chunks, key=lambda c: c.rel):
+            d = len(self.dirs)
+            self.dirs.append(chunk.rel)
+            order = sorted(range(len(chunk.names)), key=chunk.names.__getitem__)
+            self.dir_idx.extend([d] * len(order))
+            self.names.extend(chunk.names[i] for i in order)
+            self.sizes.extend(chunk.sizes[i] for i in order)
+            self.mtimes.extend(chunk.mtimes[i] for i in order)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def key(self, i: int):
+        return self.dirs[self.dir_idx[i]], self.names[i]
+
+    def rel(self, i: int) -> str:
+        d = self.dirs[self.dir_idx[i]]
+        return d + os.sep + self.names[i] if d else self.names[i]
+
+    def path(self, i: int) -> str:
+        return os.path.join(self.root, self.rel(i))
+
+    def entry(self, i: int) -> FileEntry:
+        return FileEntry(self.path(i), self.rel(i), self.sizes[i], self.mtimes[i])
+
+def walk_tables(dirpaths: Sequence[str], workers: Optional[int] = None,
+                cancel: Optional[threading.Event] = None, path_filter=None,
+                rel: str = "") -> List[EntryTable]:
+    """
+    Walk several trees concurrently (see walk_many) into EntryTables,
+    optionally only the subtree rel of each (paths stay root-relative).
+    """
+    chunks = _walk_chunks(dirpaths, workers, cancel, path_filter, rel)
+    return [EntryTable(d, c) for d, c in zip(dirpaths, chunks)]
+
+def walk_many(dirpaths: Sequence[str], workers: Optional[int] = None,
+              cancel: Optional[threading.Event] = None, path_filter=None) -> List[List[FileEntry]]:
+    """
+    Walk several trees at once on a shared thread pool, one task per
+    directory, and return one FileEntry list per root (in no particular
+    order within a list). Setting cancel stops the walk early and returns
+    what was found so far. path_filter is an optional PathFilter.
+    """
+    return [[t.entry(i) for i in range(len(t))]
+            for t in walk_tables(dirpaths, workers, cancel, path_filter)]
+
+def walk(dirpath: str, workers: Optional[int] = None, path_filter=None) -> List[FileEntry]:
+    return walk_many([dirpath], workers, path_filter=path_filter)[0]
+
+def _stat_key(st: os.stat_result):
+    return st.st_size, st.st_mtime_ns, st.st_ino
+
+_buffers = threading.local()
+
+def _hash_buffer(blocksize: int) -> memoryview:
+    buf = getattr(_buffers, "hash", None)
+    if buf is None or len(buf) < blocksize:
+        buf = memoryview(bytearray(blocksize))
+        _buffers.hash = buf
+    return buf[:blocksize]
+
+def _hash_block(size: int) -> int:
+    # small files in one read, large ones in blocks that stay cache friendly
+    return max(MIN_HASH_BLOCK, min(MAX_HASH_BLOCK, size))
+
+def _hash_stream(h, fp, size: int, blocksize: Optional[int]) -> None:
+    if size >= MMAP_THRESHOLD:
+        try:
+            mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            mm = None
+        if mm is not None:
+            with mm:
+                view = memoryview(mm)
+                step = blocksize or MAX_HASH_BLOCK
+                try:
+                    for off in range(0, len(view), step):
+                        h.update(view[off:off + step])
+                finally:
+                    view.release()
+            return
+    buf = _hash_buffer(blocksize or _hash_block(size))
+    while True:
+        n = fp.readinto(buf)
+        if not n:
+            break
+        h.update(buf[:n])
+
+def hash_file(path: str, blocksize: Optional[int] = None, index=None,
+              algorithm: str = "sha256") -> str:
+    """
+    Hex digest of a file with one of HASH_ALGORITHMS. Large files are
+    hashed straight from an mmap, the rest are read with readinto into a
+    per-thread buffer sized to the file (blocksize fixes the step size).
+    With a HashIndex, a digest recorded for the same path, size,
+    mtime_ns and inode is returned without reading the file, and a fresh
+    digest is recorded if the file did not change while it was read.
+    """
+    factory = HASH_ALGORITHMS[algorithm]
+    if index is not None:
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        digest = index.get(path, algorithm, st)
+        if digest is not None:
+            return digest
+    with open(path, "rb", buffering=0) as fp:
+        size = os.fstat(fp.fileno()).st_size
+        h = factory(size)
+        _hash_stream(h, fp, size, blocksize)
+    digest = h.hexdigest()
+    if index is not None:
+        after = os.stat(path)
+        if _stat_key(after) == _stat_key(st):
+            index.put(path, algorithm, after, digest)
+    return digest
+
+def iter_hash_entries(entries: Sequence[FileEntry], workers: Optional[int] = None,
+                      max_inflight: int = DEFAULT_HASH_INFLIGHT, index=None,
+                      algorithm: str = "sha256") -> Iterator[FileEntry]:
+    """
+    Fill in FileEntry.hash on a bounded thread pool (hashlib releases
+    the GIL, so this scales with cores and disks) and yield each entry
+    as soon as it is done. New files are only submitted while the sizes
+    of the files being hashed add up to less than max_inflight bytes;
+    one file is always allowed so a single huge file cannot stall the
+    pipeline. Entries that cannot be read keep hash=None. index and
+    algorithm are passed on to hash_file. Closing the generator cancels
+    the files not started yet.
+    """
+    todo = sorted((e for e in entries if e.hash is None), key=lambda e: e.size, reverse=True)
+    if not todo:
+        return
+    pool = ThreadPoolExecutor(max_workers=workers or DEFAULT_HASH_WORKERS)
+    try:
+        pending = {}
+        inflight = 0
+        nxt = 0
+        while nxt < len(todo) or pending:
+            while nxt < len(todo) and (not pending or inflight + todo[nxt].size <= max_inflight):
+                e = todo[nxt]
+                nxt += 1
+                pending[pool.submit(hash_file, e.path, index=index, algorithm=algorithm)] = e
+                inflight += e.size
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                e = pending.pop(fut)
+                inflight -= e.size
+                try:
+                    e.hash = fut.result()
+                except OSError:
+                    e.hash = None
+                yield e
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def hash_entries(entries: Sequence[FileEntry], workers: Optional[int] = None,
+                 max_inflight: int = DEFAULT_HASH_INFLIGHT, index=None,
+                 algorithm: str = "sha256") -> None:
+    """Hash every entry in place; see iter_hash_entries."""
+    for _ in iter_hash_entries(entries, workers, max_inflight, index, algorithm):
+        pass
+
+def _pair_buffers(blocksize: int):
+    bufs = getattr(_buffers, "pair", None)
+    if bufs is None or len(bufs[0]) != blocksize:
+        bufs = (bytearray(blocksize), bytearray(blocksize))
+        _buffers.pair = bufs
+    return bufs
+
+def _fill(fp, buf: bytearray, n: int) -> int:
+    view = memoryview(buf)
+    got = 0
+    while got < n:
+        k = fp.readinto(view[got:n])
+        if not k:
+            break
+        got += k
+    return got
+
+def _same(ba: bytearray, bb: bytearray, n: int) -> bool:
+    # whole-buffer == is a memcmp; slicing (a copy) is only needed for short blocks
+    return ba == bb if n == len(ba) else ba[:n] == bb[:n]
+
+def files_equal(a: str, b: str, blocksize: int = COMPARE_BLOCK) -> bool:
+    """
+    Byte-for-byte equality with early exit: sizes first, then the first
+    and last blocks (where headers, footers and appended data differ),
+    then the rest in order, stopping at the first differing block. Reads
+    go into two per-thread buffers that are reused across calls.
+    """
+    sa = os.stat(a)
+    sb = os.stat(b)
+    if sa.st_size != sb.st_size:
+        return False
+    if os.path.samestat(sa, sb):
+        return True
+    size = sa.st_size
+    ba, bb = _pair_buffers(blocksize)
+    with open(a, "rb", buffering=0) as fa, open(b, "rb", buffering=0) as fb:
+        def block_equal(offset: int, n: int) -> bool:
+            fa.seek(offset)
+            fb.seek(offset)
+            return _fill(fa, ba, n) == n and _fill(fb, bb, n) == n and _same(ba, bb, n)
+
+        if not block_equal(0, min(size, blocksize)):
+            return False
+        if size <= blocksize:
+            return True
+        tail = max(blocksize, size - blocksize)
+        if not block_equal(tail, size - tail):
+            return False
+        fa.seek(blocksize)
+        fb.seek(blocksize)
+        pos = blocksize
+        while pos < tail:
+            n = min(blocksize, tail - pos)
+            if _fill(fa, ba, n) != n or _fill(fb, bb, n) != n or not _same(ba, bb, n):
+                return False
+            pos += n
+    return True
+
+STATUSES = ("Equal", "Different", "Left only", "Right only",
+            "Different/Unknown (enable hashing)", "Unreadable")
+EQUAL, DIFFERENT, LEFT_ONLY, RIGHT_ONLY, UNKNOWN, UNREADABLE = range(len(STATUSES))
+_PENDING = -1
+
+def _merge(lt: EntryTable, rt: EntryTable) -> Iterator[tuple]:
+    """Sorted merge-join of two tables: yields (li, ri) with -1 for a missing side."""
+    i = j = 0
+    nl, nr = len(lt), len(rt)
+    while i < nl and j < nr:
+        kl = lt.key(i)
+        kr = rt.key(j)
+        if kl == kr:
+            yield i, j
+            i += 1
+            j += 1
+        elif kl < kr:
+            yield i, -1
+            i += 1
         else:
-            if mode == "size_time":
-                status = "Equal" if (le.size == re.size and int(le.mtime) == int(re.mtime)) else "Different"
-            else:
-                if do_hash:
-                    le.hash = hash_file(le.path)
-                    re.hash = hash_file(re.path)
-                    status = "Equal" if le.hash == re.hash else "Different"
+            yield -1, j
+            j += 1
+    for i in range(i, nl):
+        yield i, -1
+    for j in range(j, nr):
+        yield -1, j
+
+def _decide(lt: EntryTable, li: int, rt: EntryTable, ri: int, mode: str, do_hash: bool) -> int:
+    """Status code of a pair that needs no file reads, or _PENDING."""
+    if ri < 0:
+        return LEFT_ONLY
+    if li < 0:
+        return RIGHT_ONLY
+    if mode == "size_time":
+        same = lt.sizes[li] == rt.sizes[ri] and int(lt.mtimes[li]) == int(rt.mtimes[ri])
+        return EQUAL if same else DIFFERENT
+    if lt.sizes[li] != rt.sizes[ri]:
+        return DIFFERENT
+    if mode == "bytes" or do_hash:
+        return _PENDING
+    return UNKNOWN
+
+def _bytes_code(le: FileEntry, re: FileEntry) -> int:
+    try:
+        return EQUAL if files_equal(le.path, re.path) else DIFFERENT
+    except OSError:
+        return UNREADABLE
+
+def _hash_into(e: FileEntry, index, algorithm: str) -> None:
+    try:
+        e.hash = hash_file(e.path, index=index, algorithm=algorithm)
+    except OSError:
+        e.hash = None
+
+def _hash_code(le: FileEntry, re: FileEntry) -> int:
+    if le.hash is None or re.hash is None:
+        return UNREADABLE
+    return EQUAL if le.hash == re.hash else DIFFERENT
+
+def _resolve(lt: EntryTable, rt: EntryTable, pairs: Sequence[tuple], mode: str,
+             hash_workers: Optional[int], hash_inflight: int, hash_index,
+             hash_algorithm: str, cancel: Optional[threading.Event] = None) -> Iterator[tuple]:
+    """
+    Read the pending (token, li, ri) pairs, largest first, and yield
+    (token, status code) as each is decided. Pairs are submitted through
+    a window of at most 4 per worker and hash_inflight bytes (one pair
+    is always allowed), and their FileEntry objects are built on submit
+    and dropped once the pair is decided. Bytes mode compares a pair in
+    one task, content mode hashes its two files in parallel. Setting
+    cancel stops after the reads in flight, leaving the rest undecided.
+    """
+    if not pairs:
+        return
+    workers = hash_workers or DEFAULT_HASH_WORKERS
+    order = sorted(pairs, key=lambda p: lt.sizes[p[1]], reverse=True)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = {}            # future -> [token, pair bytes, futures left] shared by a pair
+        npairs = 0
+        inflight = 0
+        nxt = 0
+        while nxt < len(order) or pending:
+            if cancel is not None and cancel.is_set():
+                return
+            while nxt < len(order) and (not pending or (npairs < 4 * workers and
+                                                        inflight + 2 * lt.sizes[order[nxt][1]] <= hash_inflight)):
+                token, li, ri = order[nxt]
+                nxt += 1
+                le, re = lt.entry(li), rt.entry(ri)
+                if mode == "bytes":
+                    state = [token, 2 * le.size, 1]
+                    pending[pool.submit(_bytes_code, le, re)] = state
                 else:
-                    status = "Different/Unknown (enable hashing)"
+                    state = [token, 2 * le.size, 2, le, re]
+                    pending[pool.submit(_hash_into, le, hash_index, hash_algorithm)] = state
+                    pending[pool.submit(_hash_into, re, hash_index, hash_algorithm)] = state
+                npairs += 1
+                inflight += state[1]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                state = pending.pop(fut)
+                state[2] -= 1
+                if state[2]:
+                    continue        # the other file of the pair is still being hashed
+                npairs -= 1
+                inflight -= state[1]
+                yield state[0], fut.result() if mode == "bytes" else _hash_code(state[3], state[4])
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _row(lt: EntryTable, li: int, rt: EntryTable, ri: int, code: int) -> dict:
+    return {
+        "relpath": lt.rel(li) if li >= 0 else rt.rel(ri),
+        "left_size": lt.sizes[li] if li >= 0 else "",
+        "right_size": rt.sizes[ri] if ri >= 0 else "",
+        "status": STATUSES[code],
+        "left_path": lt.path(li) if li >= 0 else "",
+        "right_path": rt.path(ri) if ri >= 0 else ""
+    }
+
+def _iter_table_rows(lt: EntryTable, rt: EntryTable, mode: str, do_hash: bool,
+                     hash_workers: Optional[int], hash_inflight: int, hash_index,
+                     hash_algorithm: str, cancel: Optional[threading.Event] = None) -> Iterator[dict]:
+    pending = []
+    for li, ri in _merge(lt, rt):
+        code = _decide(lt, li, rt, ri, mode, do_hash)
+        if code == _PENDING:
+            pending.append(((li, ri), li, ri))
+        else:
+            yield _row(lt, li, rt, ri, code)
+    for (li, ri), code in _resolve(lt, rt, pending, mode, hash_workers, hash_inflight,
+                                   hash_index, hash_algorithm, cancel):
+        yield _row(lt, li, rt, ri, code)
+
+def iter_compare_dirs(left: str, right: str, mode: str = "size_time", do_hash: bool = False,
+                      workers: Optional[int] = None, hash_workers: Optional[int] = None,
+                      hash_inflight: int = DEFAULT_HASH_INFLIGHT, hash_index=None,
+                      hash_algorithm: str = "sha256",
+                      on_total: Optional[Callable[[int], None]] = None,
+                      cancel: Optional[threading.Event] = None, path_filter=None) -> Iterator[dict]:
+    """
+    Yield compare_dirs rows as soon as each one is decided: first every
+    row that needs no file reads (one-sided, size_time, size mismatch),
+    in compare_dirs order, then the hashed / byte-compared pairs as they
+    finish. on_total, if given, is called with the row count once both
+    trees are scanned. Closing the
+    generator early cancels the outstanding reads; setting cancel also
+    interrupts the scan and stops further reads.
+    """
+    lt, rt = walk_tables([left, right], workers, cancel, path_filter)
+    if cancel is not None and cancel.is_set():
+        return
+    if on_total is not None:
+        on_total(sum(1 for _ in _merge(lt, rt)))
+    yield from _iter_table_rows(lt, rt, mode, do_hash, hash_workers, hash_inflight,
+                                hash_index, hash_algorithm, cancel)
+
+class CompareResult(SequenceABC):
+    """
+    Result of compare_dirs, stored as columns (left index, right index,
+    status code) over the two EntryTables. Row dicts are only built when
+    indexed or iterated, e.g. for display or export.
+    """
+    def __init__(self, left: EntryTable, right: EntryTable):
+        self.left = left
+        self.right = right
+        self.left_idx = array("q")
+        self.right_idx = array("q")
+        self.codes = array("b")
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(len(self)))]
+        return _row(self.left, self.left_idx[i], self.right, self.right_idx[i], self.codes[i])
+
+    def status(self, i: int) -> str:
+        return STATUSES[self.codes[i]]
+
+    def counts(self) -> dict:
+        """Rows per status, without building any row."""
+        out = {}
+        for code in range(len(STATUSES)):
+            n = self.codes.count(code)
+            if n:
+                out[STATUSES[code]] = n
+        return out
+
+def compare_dirs(left: str, right: str, mode: str = "size_time", do_hash: bool = False,
+                 workers: Optional[int] = None, hash_workers: Optional[int] = None,
+                 hash_inflight: int = DEFAULT_HASH_INFLIGHT, hash_index=None,
+                 hash_algorithm: str = "sha256", path_filter=None) -> CompareResult:
+    """
+    mode: 'size_time', 'content' or 'bytes'
+    workers: threads used to scan both trees (default DEFAULT_WALK_WORKERS)
+    hash_workers / hash_inflight: thread count and bytes-in-flight cap of
+    the content hashing pool (see iter_hash_entries)
+    hash_index: optional HashIndex; unchanged files are not re-read
+    hash_algorithm: one of HASH_ALGORITHMS, used when do_hash is set
+    path_filter: optional PathFilter; excluded directories are not walked
+
+    In 'content' mode, pairs whose sizes differ are Different without
+    being read; only same-size pairs are hashed. 'bytes' mode compares
+    same-size pairs directly with files_equal (no hashing, stops at the
+    first difference) on the same thread pool.
+
+    Both trees are held as EntryTables and matched with a sorted
+    merge-join. Rows are ordered by directory, then file name, and are
+    returned as a CompareResult sequence of row dicts built on access;
+    iter_compare_dirs streams them instead.
+    """
+    lt, rt = walk_tables([left, right], workers, path_filter=path_filter)
+    result = CompareResult(lt, rt)
+    pending = []
+    for li, ri in _merge(lt, rt):
+        code = _decide(lt, li, rt, ri, mode, do_hash)
+        if code == _PENDING:
+            pending.append((len(result.codes), li, ri))
+        result.left_idx.append(li)
+        result.right_idx.append(ri)
+        result.codes.append(code)
+    for pos, code in _resolve(lt, rt, pending, mode, hash_workers, hash_inflight,
+                              hash_index, hash_algorithm):
+        result.codes[pos] = code
+    return result
+
+def compare_level(left: str, right: str, rel: str = "", mode: str = "size_time",
+                  do_hash: bool = False, hash_workers: Optional[int] = None,
+                  hash_index=None, hash_algorithm: str = "sha256", path_filter=None) -> List[dict]:
+    """
+    Compare only the entries directly inside rel (relative to the two
+    roots), without descending. File rows are decided as in compare_dirs;
+    subdirectory rows have is_dir=True and status 'Left only',
+    'Right only' or '' when present on both sides (see subtree_differs).
+    Rows are sorted with directories first.
+    """
+    lchunk, ldirs = _scan_dir(os.path.join(left, rel), rel, path_filter)
+    rchunk, rdirs = _scan_dir(os.path.join(right, rel), rel, path_filter)
+    ld = {r for _, r in ldirs}
+    rd = {r for _, r in rdirs}
+    rows = []
+    for k in sorted(ld | rd):
+        status = "" if (k in ld and k in rd) else ("Left only" if k in ld else "Right only")
         rows.append({
-            "relpath": k,
-            "left_size": le.size if le else "",
-            "right_size": re.size if re else "",
-            "status": status,
-            "left_path": le.path if le else "",
-            "right_path": re.path if re else ""
+            "relpath": k, "left_size": "", "right_size": "", "status": status,
+            "left_path": os.path.join(left, k) if k in ld else "",
+            "right_path": os.path.join(right, k) if k in rd else "",
+            "is_dir": True,
         })
-    return rows
+    files = list(_iter_table_rows(EntryTable(left, [lchunk]), EntryTable(right, [rchunk]), mode,
+                                  do_hash, hash_workers, DEFAULT_HASH_INFLIGHT, hash_index,
+                                  hash_algorithm))
+    files.sort(key=lambda r: r["relpath"])
+    for row in files:
+        row["is_dir"] = False
+    return rows + files
+
+def subtree_differs(left: str, right: str, rel: str = "", mode: str = "size_time",
+                    do_hash: bool = False, hash_workers: Optional[int] = None,
+                    hash_index=None, hash_algorithm: str = "sha256",
+                    cancel: Optional[threading.Event] = None, path_filter=None) -> bool:
+    """
+    True as soon as any file below rel is not Equal; stops hashing at the
+    first difference.
+    """
+    lt, rt = walk_tables([left, right], cancel=cancel, path_filter=path_filter, rel=rel)
+    if cancel is not None and cancel.is_set():
+        return False
+    rows = _iter_table_rows(lt, rt, mode, do_hash, hash_workers, DEFAULT_HASH_INFLIGHT,
+                            hash_index, hash_algorithm, cancel)
+    try:
+        return any(row["status"] != "Equal" for row in rows)
+    finally:
+        rows.close()
+
+def differing_dirs(left: str, right: str, rel: str = "", mode: str = "size_time",
+                   do_hash: bool = False, hash_workers: Optional[int] = None,
+                   hash_index=None, hash_algorithm: str = "sha256",
+                   cancel: Optional[threading.Event] = None, path_filter=None) -> Optional[set]:
+    """
+    Walk the subtree rel once and return the relpaths of rel and of the
+    directories below it that contain a file that is not Equal; every
+    other directory in the subtree is Equal. Unlike subtree_differs every
+    pair is read, so one walk gives the status of the whole subtree.
+    None if cancelled.
+    """
+    lt, rt = walk_tables([left, right], cancel=cancel, path_filter=path_filter, rel=rel)
+    if cancel is not None and cancel.is_set():
+        return None
+    out = set()
+    for row in _iter_table_rows(lt, rt, mode, do_hash, hash_workers, DEFAULT_HASH_INFLIGHT,
+                                hash_index, hash_algorithm, cancel):
+        if row["status"] == "Equal":
+            continue
+        d = os.path.dirname(row["relpath"])
+        while d not in out:
+            out.add(d)
+            if d == rel or not d:
+                break
+            d = os.path.dirname(d)
+    if cancel is not None and cancel.is_set():
+        return None         # some pairs were never read
+    return out
@@ -0,0 +1,248 @@
+"""
+Hierarchical, lazily loaded folder compare for BC-Lite.
+
+FolderTreeModel only compares a directory level the first time it is
+expanded (compare_level on a background thread, through Qt's
+canFetchMore/fetchMore). Every subdirectory present on both sides then
+gets a background differing_dirs job that fills in "Equal" or
+"Contains differences", so nothing below an unexpanded folder is listed
+up front. That one walk also gives the status of every directory below
+it, which is cached, so expanding further down starts no new walks.
+Expands run on their own thread pool, so they never queue behind those
+status walks, and a new comparison cancels the walks still running.
+"""
+import os
+import threading
+
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, QObject, QRunnable, QThreadPool, Qt, Signal
+from PySide6.QtGui import QColor
+
+try:
+    from .folder_compare import compare_level, differing_dirs
+except ImportError:
+    from folder_compare import compare_level, differing_dirs
+
+COLUMNS = ["Name", "Left Size", "Right Size", "Status"]
+PENDING = "Comparing…"
+CONTAINS_DIFF = "Contains differences"
+MAX_JOBS = 4                # subtree status walks
+MAX_LEVEL_JOBS = 2          # compare_level for expands, kept apart so they start at once
+
+class _Node:
+    __slots__ = ("row", "parent", "pos", "children", "loading", "status")
+
+    def __init__(self, row, parent, pos):
+        self.row = row              # compare_level row, None for the root
+        self.parent = parent
+        self.pos = pos              # index in parent.children
+        self.children = None        # None until the level is loaded
+        self.loading = False
+        self.status = row["status"] if row else ""
+
+    @property
+    def rel(self) -> str:
+        return self.row["relpath"] if self.row else ""
+
+    @property
+    def is_dir(self) -> bool:
+        return self.row is None or self.row["is_dir"]
+
+class _JobSignals(QObject):
+    done = Signal(object, object)   # result, error message (None on success)
+
+class _Job(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.signals = _JobSignals()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.done.emit(None, str(e))
+            return
+        self.signals.done.emit(result, None)
+
+class FolderTreeModel(QAbstractItemModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(MAX_JOBS)
+        self.level_pool = QThreadPool(self)
+        self.level_pool.setMaxThreadCount(MAX_LEVEL_JOBS)
+        self.left = self.right = ""
+        self._options = {}
+        self._root = _Node(None, None, 0)
+        self._root.children = []
+        self._generation = 0
+        self._cancel = threading.Event()
+        self._jobs = set()
+        self._walked = set()        # relpaths whose whole subtree has been walked
+        self._differing = set()     # directories found to contain differences
+        self._waiting = {}          # relpath being walked -> nodes below it awaiting a status
+
+    def set_roots(self, left: str, right: str, mode: str = "size_time", do_hash: bool = False,
+                  hash_workers=None, hash_algorithm: str = "sha256", path_filter=None):
+        """Start a new comparison; only the top level is compared right away."""
+        self.beginResetModel()
+        self._cancel.set()
+        self.pool.clear()
+        self.level_pool.clear()
+        self._jobs.clear()
+        self._walked.clear()
+        self._differing.clear()
+        self._waiting.clear()
+        self._cancel = threading.Event()
+        self._generation += 1
+        self.left, self.right = left, right
+        self._options = dict(mode=mode, do_hash=do_hash, hash_workers=hash_workers,
+                             hash_algorithm=hash_algorithm, path_filter=path_filter)
+        self._root = _Node(None, None, 0)
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def _start(self, pool, fn, callback, *args, **kwargs):
+        job = _Job(fn, *args, **kwargs)
+        gen = self._generation
+
+        def finished(result, error):
+            self._jobs.discard(job)
+            if gen == self._generation:
+                callback(result, error)
+
+        job.signals.done.connect(finished)
+        self._jobs.add(job)
+        pool.start(job)
+
+    # --- tree structure ---------------------------------------------------
+
+    def _node(self, index: QModelIndex) -> _Node:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def _index_of(self, node: _Node, column: int = 0) -> QModelIndex:
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.pos, column, node)
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self._node(parent)
+        if not node.children or not (0 <= row < len(node.children)):
+            return QModelIndex()
+        return self.createIndex(row, column, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        return self._index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        children = self._node(parent).children
+        return len(children) if children else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(COLUMNS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node(parent)
+        if not node.is_dir:
+            return False
+        return node.children is None or len(node.children) > 0
+
+    def canFetchMore(self, parent):
+        node = self._node(parent)
+        return node.is_dir and node.children is None and not node.loading
+
+    def fetchMore(self, parent):
+        node = self._node(parent)
+        if not self.canFetchMore(parent) or not self.left:
+            return
+        node.loading = True
+        self._start(self.level_pool, compare_level, lambda rows, err: self._level_loaded(node, rows, err),
+                    self.left, self.right, node.rel, **self._options)
+
+    def _level_loaded(self, node: _Node, rows, error):
+        node.loading = False
+        if error is not None:
+            node.children = []
+            node.status = f"Error: {error}"
+            self._changed(node)
+            return
+        children = [_Node(row, node, pos) for pos, row in enumerate(rows)]
+        if children:
+            self.beginInsertRows(self._index_of(node), 0, len(children) - 1)
+            node.children = children
+            self.endInsertRows()
+        else:
+            node.children = []
+            self._changed(node)
+        for child in children:
+            if child.is_dir and child.status == "":
+                self._subtree_status(child)
+
+    def _walk_root(self, rel: str):
+        """The walked or walking relpath rel lies in, if any."""
+        while True:
+            if rel in self._walked or rel in self._waiting:
+                return rel
+            if not rel:
+                return None
+            rel = os.path.dirname(rel)
+
+    def _subtree_status(self, node: _Node):
+        root = self._walk_root(node.rel)
+        if root in self._walked:
+            node.status = CONTAINS_DIFF if node.rel in self._differing else "Equal"
+            return
+        node.status = PENDING
+        if root is not None:
+            self._waiting[root].append(node)
+            return
+        self._waiting[node.rel] = [node]
+        self._start(self.pool, differing_dirs, lambda dirs, err, rel=node.rel: self._subtree_done(rel, dirs, err),
+                    self.left, self.right, node.rel, cancel=self._cancel, **self._options)
+
+    def _subtree_done(self, rel: str, dirs, error):
+        nodes = self._waiting.pop(rel, [])
+        if error is None and dirs is not None:
+            self._walked.add(rel)
+            self._differing |= dirs
+        for node in nodes:
+            if error is not None:
+                node.status = f"Error: {error}"
+            elif dirs is not None:
+                node.status = CONTAINS_DIFF if node.rel in dirs else "Equal"
+            self._changed(node)
+
+    def _changed(self, node: _Node):
+        if node is self._root:
+            return
+        self.dataChanged.emit(self._index_of(node, 0), self._index_of(node, len(COLUMNS) - 1))
+
+    # --- display ----------------------------------------------------------
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        col = index.column()
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return os.path.basename(node.rel) + (os.sep if node.is_dir else "")
+            if col == 1:
+                return str(node.row["left_size"])
+            if col == 2:
+                return str(node.row["right_size"])
+            return node.status
+        if role == Qt.ForegroundRole and node.status not in ("Equal", "", PENDING):
+            return QColor("#b00020")
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return None
@@ -0,0 +1,127 @@
+"""
+Persistent file-hash index for BC-Lite folder compare.
+
+Maps (absolute path, algorithm) to the digest of the file together with
+the size, mtime_ns and inode it had when it was hashed. A lookup only
+hits when all three still match, so any change to the file invalidates
+its entry and the next hash overwrites it. The index is a SQLite file in
+CONFIG_DIR, shared by the hashing threads, and is pruned to a maximum
+number of rows by dropping the least recently used ones.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    from .settings import CONFIG_DIR
+except ImportError:
+    from settings import CONFIG_DIR
+
+INDEX_PATH = CONFIG_DIR / "hash-index.sqlite"
+
+DEFAULT_MAX_ENTRIES = 2_000_000
+COMMIT_EVERY = 1000                 # pending writes before an implicit commit
+RACY_WINDOW_NS = 2_000_000_000      # files modified this recently are not recorded
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    used INTEGER NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+CREATE INDEX IF NOT EXISTS hashes_used ON hashes (used);
+"""
+
+class HashIndex:
+    def __init__(self, path: Path = INDEX_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(_SCHEMA)
+        except sqlite3.DatabaseError:
+            # corrupt or foreign file: start over
+            self._db.close()
+            self.path.unlink(missing_ok=True)
+            self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._db.executescript(_SCHEMA)
+
+    def get(self, path: str, algorithm: str, st: os.stat_result) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, inode, digest FROM hashes WHERE path = ? AND algorithm = ?",
+                (path, algorithm)).fetchone()
+            if row is None or row[:3] != (st.st_size, st.st_mtime_ns, st.st_ino):
+                return None
+            self._db.execute("UPDATE hashes SET used = ? WHERE path = ? AND algorithm = ?",
+                             (time.time_ns(), path, algorithm))
+            self._written()
+            return row[3]
+
+    def put(self, path: str, algorithm: str, st: os.stat_result, digest: str) -> None:
+        # A file written within the mtime granularity of the hash could change
+        # again without its metadata changing; leave it to be re-hashed.
+        now = time.time_ns()
+        if now - st.st_mtime_ns < RACY_WINDOW_NS:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, algorithm, st.st_size, st.st_mtime_ns, st.st_ino, digest, now))
+            self._written()
+
+    def _written(self) -> None:
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self._db.commit()
+            self._pending = 0
+
+    def invalidate(self, path_prefix: str) -> None:
+        """Forget every entry at or below path_prefix."""
+        prefix = os.path.abspath(path_prefix)
+        below = prefix.rstrip(os.sep) + os.sep
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM hashes WHERE path = ? OR substr(path, 1, ?) = ?",
+                (prefix, len(below), below))
+            self._db.commit()
+            self._pending = 0
+
+    def prune(self) -> None:
+        """Drop least recently used entries until at most max_entries remain."""
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM hashes").fetchone()
+            extra = count - self.max_entries
+            if extra > 0:
+                self._db.execute(
+                    "DELETE FROM hashes WHERE rowid IN "
+                    "(SELECT rowid FROM hashes ORDER BY used LIMIT ?)", (extra,))
+            self._db.commit()
+            self._pending = 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM hashes")
+            self._db.commit()
+            self._pending = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def close(self) -> None:
+        self.prune()
+        with self._lock:
+            self._db.close()
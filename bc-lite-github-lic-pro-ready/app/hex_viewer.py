@@ -1,17 +1,198 @@
-from PySide6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QTextEdit,
-                               QPushButton, QFileDialog, QSplitter)
-from PySide6.QtCore import Qt
+"""
+Side-by-side hex diff for BC-Lite.
+
+Both files are mmap'ed, never read into memory. HexTableModel formats a
+cell only when the view asks for it, so just the rows in the viewport
+are ever turned into text and opening a file of any size is instant.
+The two HexTableViews share one RowLayout and scroll together. A
+background DiffScanWorker either aligns the files around inserted and
+deleted bytes (binary_diff.align, the default up to ALIGN_MAX_BYTES) or
+indexes the bytes that differ at equal offsets (binary_diff.scan_regions). The differing rows
+drive next/previous-difference navigation and the DiffOverviewBar.
+"""
+import mmap
+import threading
+
+from PySide6.QtWidgets import (QWidget, QHBoxLayout, QVBoxLayout, QLabel, QPushButton, QProgressBar,
+                               QCheckBox, QFileDialog, QSplitter, QTableView, QHeaderView, QAbstractItemView)
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, Qt, Signal
+from PySide6.QtGui import QColor, QFontDatabase, QPainter
+
+from binary_diff import ALIGN_MAX_BYTES, RowLayout, align, ascii_cells, regions_to_rows, scan_regions
 
 BYTES_PER_ROW = 16
 
-def to_hex_rows(data: bytes, bytes_per_row: int = BYTES_PER_ROW):
-    rows = []
-    for i in range(0, len(data), bytes_per_row):
-        chunk = data[i:i+bytes_per_row]
-        hexpart = ' '.join(f"{b:02X}" for b in chunk)
-        asciipart = ''.join((chr(b) if 32 <= b <= 126 else '.') for b in chunk)
-        rows.append((i, hexpart, asciipart, chunk))
-    return rows
+_HEX = [f"{b:02X}" for b in range(256)]
+_DIFF_FG = QColor("#b00020")
+_DIFF_BG = QColor("#ffe3e3")
+
+def _map_file(path: str):
+    """Read-only mmap of a file (b"" for an empty one, which cannot be mapped)."""
+    with open(path, "rb") as fp:
+        try:
+            return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return b""
+
+class HexTableModel(QAbstractTableModel):
+    """
+    One pane of the hex diff: a column per byte plus an ASCII column, the
+    offset in the vertical header. Rows come from a RowLayout shared with
+    the other pane; `side` picks this pane's half of each row, and bytes
+    outside equal hunks are compared with the other half.
+    """
+    def __init__(self, side: int, parent=None):
+        super().__init__(parent)
+        self.side = side
+        self.bpr = BYTES_PER_ROW
+        self.buf = b""
+        self.other = b""
+        self.layout = RowLayout([], BYTES_PER_ROW)
+        self._cached = (-1, None)
+
+    def set_layout(self, buf, other, layout: RowLayout):
+        self.beginResetModel()
+        self.buf, self.other, self.layout, self.bpr = buf, other, layout, layout.bpr
+        self._cached = (-1, None)
+        self.endResetModel()
+
+    def _row(self, r: int):
+        """(tag, own offset, own count, other offset, other count) of row r."""
+        if self._cached[0] != r:
+            tag, a0, na, b0, nb = self.layout.row(r)
+            self._cached = (r, (tag, a0, na, b0, nb) if self.side == 0 else (tag, b0, nb, a0, na))
+        return self._cached[1]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.layout.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.bpr + 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        tag, off, n, other_off, other_n = self._row(index.row())
+        col = index.column()
+        if col == self.bpr:                 # ASCII column
+            if role == Qt.DisplayRole:
+                return ascii_cells(self.buf[off:off + n])
+            return None
+        if role == Qt.DisplayRole:
+            if col < n:
+                return _HEX[self.buf[off + col]]
+            return "--" if col < other_n else ""
+        if role in (Qt.ForegroundRole, Qt.BackgroundRole):
+            if tag == "equal" or (col >= n and col >= other_n):
+                return None
+            if col < n and col < other_n and self.buf[off + col] == self.other[other_off + col]:
+                return None
+            return _DIFF_FG if role == Qt.ForegroundRole else _DIFF_BG
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            _, off, n, _, _ = self._row(section)
+            return f"{off:08X}" if n else ""
+        return "ASCII" if section == self.bpr else f"{section:X}"
+
+class HexTableView(QTableView):
+    """Fixed-size monospace cells, so scrolling never measures rows."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        font = QFontDatabase.systemFont(QFontDatabase.FixedFont)
+        self.setFont(font)
+        self.setShowGrid(False)
+        self.setWordWrap(False)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerItem)
+        self.setSelectionMode(QAbstractItemView.ContiguousSelection)
+        cell = self.fontMetrics().horizontalAdvance("00") + 8
+        row_h = self.fontMetrics().height() + 4
+        for header in (self.horizontalHeader(), self.verticalHeader()):
+            header.setSectionResizeMode(QHeaderView.Fixed)
+        self.horizontalHeader().setDefaultSectionSize(cell)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.verticalHeader().setDefaultSectionSize(row_h)
+        self.verticalHeader().setFont(font)
+
+    def goto_row(self, row: int, column: int = 0):
+        model = self.model()
+        if model is None or not model.rowCount():
+            return
+        idx = model.index(min(max(row, 0), model.rowCount() - 1), column)
+        self.scrollTo(idx, QAbstractItemView.PositionAtCenter)
+        self.setCurrentIndex(idx)
+
+class _ScanSignals(QObject):
+    progress = Signal(int)          # per mille
+    finished = Signal(object)       # align hunks or scan_regions result, None if cancelled
+    failed = Signal(str)
+
+class DiffScanWorker(QRunnable):
+    """Runs align or scan_regions over both maps on a QThreadPool thread."""
+    def __init__(self, a, b, aligned: bool = True):
+        super().__init__()
+        self.signals = _ScanSignals()
+        self.a = a
+        self.b = b
+        self.aligned = aligned
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        last = [-1]
+
+        def progress(done, total):
+            permille = done * 1000 // max(total, 1)
+            if permille != last[0]:
+                last[0] = permille
+                self.signals.progress.emit(permille)
+
+        try:
+            fn = align if self.aligned else scan_regions
+            result = fn(self.a, self.b, progress=progress, cancel=self._cancel)
+        except (OSError, ValueError) as e:     # ValueError: map closed under us
+            if not self._cancel.is_set():
+                self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(None if self._cancel.is_set() else result)
+
+class DiffOverviewBar(QWidget):
+    """Thin strip with a mark for every pixel row that covers a differing row; click to jump."""
+    jump = Signal(object)           # display row (may exceed a C int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedWidth(14)
+        self.regions = None
+        self.total = 0
+
+    def set_regions(self, regions, total: int):
+        self.regions = regions
+        self.total = total
+        self.update()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor("#f0f0f0"))
+        h = self.height()
+        if not self.regions or not self.total or h <= 0:
+            return
+        # one bisect per pixel row, however many regions there are
+        for y in range(h):
+            start = y * self.total // h
+            if self.regions.overlaps(start, max((y + 1) * self.total // h, start + 1)):
+                p.fillRect(0, y, self.width(), 1, _DIFF_FG)
+
+    def mousePressEvent(self, event):
+        if self.total and self.height() > 0:
+            self.jump.emit(int(event.position().y()) * self.total // self.height())
 
 class HexDiffViewer(QWidget):
     def __init__(self, settings=None, parent=None):
@@ -19,77 +200,201 @@ class HexDiffViewer(QWidget):
         self.settings = settings
         self.left_path = None
         self.right_path = None
+        self._maps = []
+        self._scan_worker = None
+        self._scan_note = ""
+        self.diff_rows = None
 
         layout = QVBoxLayout(self)
         ctrl = QHBoxLayout()
         self.left_btn = QPushButton("Left File…")
         self.right_btn = QPushButton("Right File…")
         self.compare_btn = QPushButton("Compare Hex")
+        self.align_chk = QCheckBox("Align insertions")
+        self.align_chk.setChecked(True)
+        self.align_chk.setToolTip("Match blocks across inserted/deleted bytes instead of comparing equal offsets")
         ctrl.addWidget(self.left_btn)
         ctrl.addWidget(self.right_btn)
+        ctrl.addWidget(self.align_chk)
         ctrl.addWidget(self.compare_btn)
+        self.prev_btn = QPushButton("◀ Prev Difference")
+        self.next_btn = QPushButton("Next Difference ▶")
+        self.prev_btn.setEnabled(False)
+        self.next_btn.setEnabled(False)
+        ctrl.addWidget(self.prev_btn)
+        ctrl.addWidget(self.next_btn)
+        self.scan_progress = QProgressBar()
+        self.scan_progress.setRange(0, 1000)
+        self.scan_progress.setVisible(False)
+        ctrl.addWidget(self.scan_progress)
+        self.diff_label = QLabel("")
+        ctrl.addWidget(self.diff_label)
         ctrl.addStretch(1)
         layout.addLayout(ctrl)
 
         splitter = QSplitter(Qt.Horizontal)
-        self.left_view = QTextEdit()
-        self.left_view.setReadOnly(True)
-        self.right_view = QTextEdit()
-        self.right_view.setReadOnly(True)
-        splitter.addWidget(self.left_view)
-        splitter.addWidget(self.right_view)
-        layout.addWidget(splitter)
+        self.left_label = QLabel("No left file")
+        self.right_label = QLabel("No right file")
+        self.left_model = HexTableModel(0, parent=self)
+        self.right_model = HexTableModel(1, parent=self)
+        self.left_view = HexTableView()
+        self.left_view.setModel(self.left_model)
+        self.right_view = HexTableView()
+        self.right_view.setModel(self.right_model)
+        for label, view in ((self.left_label, self.left_view), (self.right_label, self.right_view)):
+            pane = QWidget()
+            pane_layout = QVBoxLayout(pane)
+            pane_layout.setContentsMargins(0, 0, 0, 0)
+            pane_layout.addWidget(label)
+            pane_layout.addWidget(view)
+            splitter.addWidget(pane)
+        self.overview = DiffOverviewBar()
+        body = QHBoxLayout()
+        body.addWidget(splitter, 1)
+        body.addWidget(self.overview)
+        layout.addLayout(body)
+
+        # keep both panes on the same rows
+        for get in (QTableView.verticalScrollBar, QTableView.horizontalScrollBar):
+            a, b = get(self.left_view), get(self.right_view)
+            a.valueChanged.connect(b.setValue)
+            b.valueChanged.connect(a.setValue)
 
         self.left_btn.clicked.connect(self.pick_left)
         self.right_btn.clicked.connect(self.pick_right)
         self.compare_btn.clicked.connect(self.compare_files)
+        self.prev_btn.clicked.connect(self.prev_difference)
+        self.next_btn.clicked.connect(self.next_difference)
+        self.overview.jump.connect(self.goto_row)
 
     def pick_left(self):
         p, _ = QFileDialog.getOpenFileName(self, "Choose Left File")
         if p:
             self.left_path = p
-            self.left_view.setPlainText(f"{p} (not compared yet)")
+            self.left_label.setText(f"{p} (not compared yet)")
 
     def pick_right(self):
         p, _ = QFileDialog.getOpenFileName(self, "Choose Right File")
         if p:
             self.right_path = p
-            self.right_view.setPlainText(f"{p} (not compared yet)")
+            self.right_label.setText(f"{p} (not compared yet)")
+
+    def _bytes_per_row(self) -> int:
+        return getattr(self.settings, 'bytes_per_row', BYTES_PER_ROW) if self.settings else BYTES_PER_ROW
 
-    def _read_bytes(self, p: str) -> bytes:
-        with open(p, "rb") as f:
-            return f.read()
+    def _set_layout(self, layout: RowLayout):
+        la, rb = self._maps if self._maps else (b"", b"")
+        self.left_model.set_layout(la, rb, layout)
+        self.right_model.set_layout(rb, la, layout)
+
+    def _release(self):
+        """Stop the scan, detach the models from the current maps, then unmap them."""
+        if self._scan_worker is not None:
+            self._scan_worker.cancel()
+            self._scan_worker = None
+        self.diff_rows = None
+        self.overview.set_regions(None, 0)
+        self.prev_btn.setEnabled(False)
+        self.next_btn.setEnabled(False)
+        self.scan_progress.setVisible(False)
+        self.diff_label.setText("")
+        maps, self._maps = self._maps, []
+        self._set_layout(RowLayout([], self._bytes_per_row()))
+        for m in maps:
+            if isinstance(m, mmap.mmap):
+                m.close()
 
     def compare_files(self):
         if not (self.left_path and self.right_path):
             return
-        la = self._read_bytes(self.left_path)
-        rb = self._read_bytes(self.right_path)
-        bpr = getattr(self.settings, 'bytes_per_row', BYTES_PER_ROW) if self.settings else BYTES_PER_ROW
-        left_rows = to_hex_rows(la, bpr)
-        right_rows = to_hex_rows(rb, bpr)
-        maxr = max(len(left_rows), len(right_rows))
-
-        left_lines = []
-        right_lines = []
-        for i in range(maxr):
-            l = left_rows[i] if i < len(left_rows) else (i*BYTES_PER_ROW, '', '', b'')
-            r = right_rows[i] if i < len(right_rows) else (i*BYTES_PER_ROW, '', '', b'')
-            l_hex = l[1].split()
-            r_hex = r[1].split()
-            merged_l = []
-            merged_r = []
-            for idx in range(max(len(l_hex), len(r_hex))):
-                lh = l_hex[idx] if idx < len(l_hex) else "--"
-                rh = r_hex[idx] if idx < len(r_hex) else "--"
-                if lh == rh:
-                    merged_l.append(lh)
-                    merged_r.append(rh)
-                else:
-                    merged_l.append(f"[{lh}]")
-                    merged_r.append(f"[{rh}]")
-            left_lines.append(f"{l[0]:08X}: {' '.join(merged_l):<47} | {l[2]}")
-            right_lines.append(f"{r[0]:08X}: {' '.join(merged_r):<47} | {r[2]}")
-
-        self.left_view.setPlainText("\n".join(left_lines))
-        self.right_view.setPlainText("\n".join(right_lines))
+        self._release()
+        try:
+            la = _map_file(self.left_path)
+            rb = _map_file(self.right_path)
+        except OSError as e:
+            self.left_label.setText(f"Error: {e}")
+            return
+        self._maps = [la, rb]
+        # equal offsets right away; an aligned layout replaces it when ready
+        self._set_layout(RowLayout.plain(len(la), len(rb), self._bytes_per_row()))
+        self.left_label.setText(f"{self.left_path} ({len(la):,} bytes)")
+        self.right_label.setText(f"{self.right_path} ({len(rb):,} bytes)")
+
+        # aligning unmatched data runs at a few MB/s, so big files stay at equal offsets
+        too_big = max(len(la), len(rb)) > ALIGN_MAX_BYTES
+        aligned = self.align_chk.isChecked() and not too_big
+        self._scan_note = " (too large to align; equal offsets)" if too_big and self.align_chk.isChecked() else ""
+        worker = DiffScanWorker(la, rb, aligned)
+        worker.signals.progress.connect(self.scan_progress.setValue)
+        worker.signals.finished.connect(lambda result, w=worker: self._scan_done(w, result))
+        worker.signals.failed.connect(lambda msg, w=worker: self._scan_failed(w, msg))
+        self._scan_worker = worker
+        self.scan_progress.setValue(0)
+        self.scan_progress.setVisible(True)
+        self.diff_label.setText("Aligning…" if aligned else "Finding differences…")
+        QThreadPool.globalInstance().start(worker)
+
+    def _scan_done(self, worker, result):
+        if worker is not self._scan_worker or result is None:
+            return
+        self._scan_worker = None
+        self.scan_progress.setVisible(False)
+        bpr = self._bytes_per_row()
+        if worker.aligned:
+            layout = RowLayout(result, bpr)
+            self._set_layout(layout)
+            self.diff_rows = layout.diff_rows()
+            changes = [h for h in result if h.tag != "equal"]
+            summary = (f"{len(changes):,} differences (-{sum(h.a_end - h.a_start for h in changes):,} "
+                       f"+{sum(h.b_end - h.b_start for h in changes):,} bytes)")
+        else:
+            self.diff_rows = regions_to_rows(result, bpr)
+            summary = f"{len(result):,} differences ({result.total_bytes():,} bytes)"
+        self.overview.set_regions(self.diff_rows, self.left_model.rowCount())
+        if not self.diff_rows:
+            self.diff_label.setText("Files are identical")
+            return
+        self.diff_label.setText(summary + self._scan_note)
+        self.prev_btn.setEnabled(True)
+        self.next_btn.setEnabled(True)
+        self.goto_row(self.diff_rows.starts[0])
+
+    def _scan_failed(self, worker, message):
+        if worker is not self._scan_worker:
+            return
+        self._scan_worker = None
+        self.scan_progress.setVisible(False)
+        self.diff_label.setText(f"Error: {message}")
+
+    def goto_row(self, row: int):
+        self.left_view.goto_row(row)
+        self.right_view.goto_row(row)
+
+    def goto_offset(self, offset: int, side: int = 0):
+        """Show byte `offset` of the left (side 0) or right (side 1) file."""
+        layout = self.left_model.layout
+        row = layout.row_of(offset, side)
+        _, a0, _, b0, _ = layout.row(row) if layout.rows else (None, 0, 0, 0, 0)
+        col = min(max(offset - (a0 if side == 0 else b0), 0), layout.bpr - 1)
+        self.left_view.goto_row(row, col)
+        self.right_view.goto_row(row, col)
+
+    def _current_row(self) -> int:
+        idx = self.left_view.currentIndex()
+        return idx.row() if idx.isValid() else -1
+
+    def next_difference(self):
+        if self.diff_rows:
+            i = self.diff_rows.next_after(self._current_row())
+            if i is not None:
+                self.goto_row(self.diff_rows.starts[i])
+
+    def prev_difference(self):
+        if self.diff_rows:
+            i = self.diff_rows.prev_before(self._current_row())
+            if i is not None:
+                self.goto_row(self.diff_rows.starts[i])
+
+    def closeEvent(self, event):
+        self._release()
+        super().closeEvent(event)
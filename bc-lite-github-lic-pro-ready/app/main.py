@@ -1,15 +1,24 @@
 #!/usr/bin/env python3
-import sys, os, argparse
+import sys, os, argparse, multiprocessing, threading, time
 from pathlib import Path
 
 import chardet
 from PySide6.QtWidgets import (QApplication, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                                QFileDialog, QTreeWidget, QTreeWidgetItem, QTextEdit, QLabel,
-                               QComboBox, QMessageBox, QLineEdit, QDialog, QDialogButtonBox)
-from PySide6.QtCore import Qt
-
-from diff import myers_diff
-from folder_compare import compare_dirs
+                               QComboBox, QMessageBox, QLineEdit, QDialog, QDialogButtonBox,
+                               QCheckBox, QSpinBox, QDoubleSpinBox, QProgressBar, QTreeView)
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QColor, QTextCharFormat, QTextCursor
+
+from diff import (APPROX_NOTICE, DIFF_ALGORITHMS, INTRALINE_MODES, DiffBudget, compute_diff,
+                  intraline_spans)
+from diff_cache import DiffCache
+from batch_diff import change_summary, iter_batch_diff, write_batch_report
+from folder_compare import HASH_ALGORITHMS, iter_compare_dirs
+from folder_tree import FolderTreeModel
+from hash_index import HashIndex
+from move_detect import detect_moves
+from path_filter import PathFilter, split_patterns
 from three_way_merge import merge_text
 from hex_viewer import HexDiffViewer
 from licensing import check_license
@@ -28,8 +37,9 @@ else:
 
 
 class FileDiffWidget(QWidget):
-    def __init__(self):
+    def __init__(self, settings=None):
         super().__init__()
+        self.settings = settings
         layout = QVBoxLayout(self)
 
         top = QHBoxLayout()
@@ -58,8 +68,13 @@ class FileDiffWidget(QWidget):
         views_row.addWidget(self.left_view)
         views_row.addWidget(self.right_view)
 
+        self.notice = QLabel(APPROX_NOTICE)
+        self.notice.setStyleSheet("background: #fff4cc; padding: 4px;")
+        self.notice.setVisible(False)
+
         layout.addLayout(top)
         layout.addLayout(path_row)
+        layout.addWidget(self.notice)
         layout.addLayout(views_row)
 
         self.left_btn.clicked.connect(self.pick_left)
@@ -107,23 +122,14 @@ class FileDiffWidget(QWidget):
 
         a_lines = self._read_text(l).splitlines()
         b_lines = self._read_text(r).splitlines()
-        diff = myers_diff(a_lines, b_lines)
-
-        left_aligned = []
-        right_aligned = []
-        for tag, line in diff:
-            if tag == " ":
-                left_aligned.append(line)
-                right_aligned.append(line)
-            elif tag == "-":
-                left_aligned.append(line)
-                right_aligned.append("")
-            else:
-                left_aligned.append("")
-                right_aligned.append(line)
+        s = self.settings or AppSettings()
+        budget = DiffBudget(max_cost=s.diff_max_cost or None, timeout=s.diff_timeout or None)
+        cache = DiffCache(max_bytes=s.diff_cache_mb * 1024 * 1024) if s.diff_cache_mb > 0 else None
+        result = compute_diff(a_lines, b_lines, s.diff_algorithm, budget, cache)
+        self.notice.setVisible(result.approximate)
 
-        self.left_view.setPlainText("\n".join(left_aligned))
-        self.right_view.setPlainText("\n".join(right_aligned))
+        self.left_view.setPlainText("\n".join(l or "" for _, l, _ in result.aligned_rows()))
+        self.right_view.setPlainText("\n".join(r or "" for _, _, r in result.aligned_rows()))
 
         # Apply syntax highlighting based on file extension
         suffix = Path(l).suffix
@@ -132,9 +138,177 @@ class FileDiffWidget(QWidget):
         self.left_highlighter = CodeHighlighter(self.left_view.document(), lang)
         self.right_highlighter = CodeHighlighter(self.right_view.document(), lang)
 
+        self._mark_intraline(result, s.intraline)
+
+    def _mark_intraline(self, result, mode: str):
+        """Highlight word/char changes inside the paired lines of replace hunks."""
+        if mode == "off":
+            return
+        left_doc = self.left_view.document()
+        right_doc = self.right_view.document()
+        left_fmt = QTextCharFormat()
+        left_fmt.setBackground(QColor("#ffb3b3"))
+        right_fmt = QTextCharFormat()
+        right_fmt.setBackground(QColor("#a8f0a8"))
+        row = 0
+        for h in result:
+            na = h.a_end - h.a_start
+            nb = h.b_end - h.b_start
+            if h.tag == 'replace':
+                for k in range(min(na, nb)):
+                    spans = intraline_spans(result.a[h.a_start + k], result.b[h.b_start + k], mode)
+                    if spans:
+                        self._apply_spans(left_doc, row + k, spans[0], left_fmt)
+                        self._apply_spans(right_doc, row + k, spans[1], right_fmt)
+            row += max(na, nb)
+
+    @staticmethod
+    def _apply_spans(doc, row: int, spans, fmt: QTextCharFormat):
+        pos = doc.findBlockByNumber(row).position()
+        cursor = QTextCursor(doc)
+        for start, end in spans:
+            cursor.setPosition(pos + start)
+            cursor.setPosition(pos + end, QTextCursor.KeepAnchor)
+            cursor.mergeCharFormat(fmt)
+
+def path_filter_from_settings(s: AppSettings) -> PathFilter:
+    return PathFilter(exclude=split_patterns(s.exclude_patterns),
+                      include=split_patterns(s.include_patterns),
+                      min_size=s.filter_min_size or None, max_size=s.filter_max_size or None,
+                      max_age_days=s.filter_max_age_days or None)
+
+class _CompareSignals(QObject):
+    total = Signal(int)
+    rows = Signal(list)
+    finished = Signal(bool)     # True if cancelled
+    failed = Signal(str)
+
+class FolderCompareWorker(QRunnable):
+    """Runs iter_compare_dirs on a QThreadPool thread and emits rows in batches."""
+    BATCH_ROWS = 500
+    BATCH_SECONDS = 0.1
+
+    def __init__(self, left, right, mode, algorithm, settings, path_filter=None):
+        super().__init__()
+        self.signals = _CompareSignals()
+        self.left = left
+        self.right = right
+        self.mode = mode
+        self.algorithm = algorithm
+        self.settings = settings
+        self.path_filter = path_filter
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        s = self.settings
+        do_hash = self.algorithm != "no-hash"
+        index = rows = None
+        try:
+            # only content mode hashes; opening the index can fail like any other I/O
+            if self.mode == "content" and do_hash and s.hash_index_entries > 0:
+                index = HashIndex(max_entries=s.hash_index_entries)
+            rows = iter_compare_dirs(self.left, self.right, self.mode, do_hash=do_hash,
+                                     hash_workers=s.hash_workers or None, hash_index=index,
+                                     hash_algorithm=self.algorithm if do_hash else "sha256",
+                                     on_total=self.signals.total.emit, cancel=self._cancel,
+                                     path_filter=self.path_filter)
+            batch = []
+            last = time.monotonic()
+            for row in rows:
+                if self._cancel.is_set():
+                    break
+                batch.append(row)
+                now = time.monotonic()
+                if len(batch) >= self.BATCH_ROWS or now - last >= self.BATCH_SECONDS:
+                    self.signals.rows.emit(batch)
+                    batch = []
+                    last = now
+            if batch and not self._cancel.is_set():
+                self.signals.rows.emit(batch)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        finally:
+            if rows is not None:
+                rows.close()
+            if index is not None:
+                index.close()
+        self.signals.finished.emit(self._cancel.is_set())
+
+class _BatchDiffSignals(QObject):
+    result = Signal(dict)
+    finished = Signal(str)      # summary text
+
+class BatchDiffWorker(QRunnable):
+    """Diffs every Different row on a process pool (iter_batch_diff), optionally writing a report."""
+    def __init__(self, rows, settings, report_path=None):
+        super().__init__()
+        self.signals = _BatchDiffSignals()
+        self.rows = rows
+        self.settings = settings
+        self.report_path = report_path
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        s = self.settings
+        results = iter_batch_diff(self.rows, algorithm=s.diff_algorithm, timeout=s.diff_timeout or None,
+                                  max_cost=s.diff_max_cost or None, report=bool(self.report_path),
+                                  intraline=s.intraline, cancel=self._cancel)
+
+        def relay():
+            for res in results:
+                self.signals.result.emit(res)
+                yield res
+
+        try:
+            if self.report_path:
+                with open(self.report_path, "w", encoding="utf-8") as fp:
+                    totals = write_batch_report(relay(), fp)
+            else:
+                totals = {"files": 0, "added": 0, "removed": 0}
+                for res in relay():
+                    totals["files"] += 1
+                    totals["added"] += res["added"]
+                    totals["removed"] += res["removed"]
+        except Exception as e:
+            self.signals.finished.emit(f"Batch diff failed: {e}")
+            return
+        finally:
+            results.close()
+        self.signals.finished.emit(f"Diffed {totals['files']} files: +{totals['added']} -{totals['removed']}"
+                                   + (" (cancelled)" if self._cancel.is_set() else ""))
+
+class _MoveSignals(QObject):
+    done = Signal(list)
+    failed = Signal(str)
+
+class MoveDetectWorker(QRunnable):
+    """Runs detect_moves over the one-sided rows of a finished compare."""
+    def __init__(self, rows, settings):
+        super().__init__()
+        self.signals = _MoveSignals()
+        self.rows = rows
+        self.settings = settings
+
+    def run(self):
+        try:
+            moved, _ = detect_moves(self.rows, hash_workers=self.settings.hash_workers or None)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.done.emit(moved)
+
 class FolderCompareWidget(QWidget):
-    def __init__(self):
+    def __init__(self, settings=None):
         super().__init__()
+        self.settings = settings
+        self.worker = None
         layout = QVBoxLayout(self)
 
         ctrl = QHBoxLayout()
@@ -143,22 +317,62 @@ class FolderCompareWidget(QWidget):
         self.left_path = QLineEdit()
         self.right_path = QLineEdit()
         self.mode = QComboBox()
-        self.mode.addItems(["size_time", "content"])
+        self.mode.addItems(["size_time", "content", "bytes"])
         self.hash_check = QComboBox()
-        self.hash_check.addItems(["no-hash", "sha256"])
+        self.hash_check.addItems(["no-hash"] + list(HASH_ALGORITHMS))
+        self.view_mode = QComboBox()
+        self.view_mode.addItems(["flat", "tree"])
         self.run_btn = QPushButton("Compare")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.batch_btn = QPushButton("Diff Changed Files…")
+        self.batch_btn.setEnabled(False)
+        self.moves_check = QCheckBox("Detect moves")
         for w in (self.left_btn, self.left_path, self.right_btn, self.right_path,
-                  QLabel("Mode:"), self.mode, QLabel("Hash:"), self.hash_check, self.run_btn):
+                  QLabel("Mode:"), self.mode, QLabel("Hash:"), self.hash_check,
+                  QLabel("View:"), self.view_mode, self.moves_check,
+                  self.run_btn, self.cancel_btn, self.batch_btn):
             ctrl.addWidget(w)
         layout.addLayout(ctrl)
 
+        s = self.settings or AppSettings()
+        filter_row = QHBoxLayout()
+        self.exclude_edit = QLineEdit(s.exclude_patterns)
+        self.exclude_edit.setPlaceholderText(".git/; node_modules/; build/; __pycache__/; *.pyc")
+        self.include_edit = QLineEdit(s.include_patterns)
+        self.include_edit.setPlaceholderText("all files")
+        for w in (QLabel("Exclude:"), self.exclude_edit, QLabel("Include:"), self.include_edit):
+            filter_row.addWidget(w)
+        layout.addLayout(filter_row)
+
+        status_row = QHBoxLayout()
+        self.progress = QProgressBar()
+        self.progress.setVisible(False)
+        self.counters = QLabel("")
+        status_row.addWidget(self.progress, 1)
+        status_row.addWidget(self.counters)
+        layout.addLayout(status_row)
+
         self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["RelPath", "Left Size", "Right Size", "Status"])
+        self.tree.setHeaderLabels(["RelPath", "Left Size", "Right Size", "Status", "Changes"])
         layout.addWidget(self.tree)
+        self._rows = []
+        self._items = {}
+        self.batch_worker = None
+        self._move_worker = None
+
+        # Tree view: levels are compared when expanded (see folder_tree.py)
+        self.tree_model = FolderTreeModel(self)
+        self.tree_view = QTreeView()
+        self.tree_view.setModel(self.tree_model)
+        self.tree_view.setVisible(False)
+        layout.addWidget(self.tree_view)
 
         self.left_btn.clicked.connect(self.pick_left)
         self.right_btn.clicked.connect(self.pick_right)
         self.run_btn.clicked.connect(self.run_compare)
+        self.cancel_btn.clicked.connect(self.cancel_compare)
+        self.batch_btn.clicked.connect(self.run_batch_diff)
 
     def pick_left(self):
         d = QFileDialog.getExistingDirectory(self, "Choose Left Folder")
@@ -176,12 +390,159 @@ class FolderCompareWidget(QWidget):
         if not (l and r and os.path.isdir(l) and os.path.isdir(r)):
             QMessageBox.warning(self, "Error", "Please pick two folders to compare.")
             return
-        do_hash = (self.hash_check.currentText() == "sha256")
-        rows = compare_dirs(l, r, self.mode.currentText(), do_hash=do_hash)
+        s = self.settings or AppSettings()
+        if (s.exclude_patterns, s.include_patterns) != (self.exclude_edit.text(), self.include_edit.text()):
+            s.exclude_patterns = self.exclude_edit.text()
+            s.include_patterns = self.include_edit.text()
+            if self.settings is not None:
+                save_settings(s)
+        path_filter = path_filter_from_settings(s) or None
+        self._move_worker = None        # results of a running move detection no longer apply
+        tree_mode = self.view_mode.currentText() == "tree"
+        self.tree.setVisible(not tree_mode)
+        self.tree_view.setVisible(tree_mode)
+        if tree_mode:
+            algorithm = self.hash_check.currentText()
+            do_hash = algorithm != "no-hash"
+            self.tree_model.set_roots(l, r, self.mode.currentText(), do_hash=do_hash,
+                                      hash_workers=s.hash_workers or None,
+                                      hash_algorithm=algorithm if do_hash else "sha256",
+                                      path_filter=path_filter)
+            return
         self.tree.clear()
+        self._rows = []
+        self._items = {}
+        self.batch_btn.setEnabled(False)
+        self.tree.setSortingEnabled(False)
+        self._counts = {}
+        self._started = time.monotonic()
+        self.counters.setText("Scanning…")
+        self.progress.setRange(0, 0)    # busy until the scan reports a total
+        self.progress.setVisible(True)
+        self.run_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+
+        worker = FolderCompareWorker(l, r, self.mode.currentText(), self.hash_check.currentText(),
+                                     s, path_filter)
+        worker.signals.total.connect(self._on_total)
+        worker.signals.rows.connect(self._on_rows)
+        worker.signals.finished.connect(self._on_finished)
+        worker.signals.failed.connect(self._on_failed)
+        self.worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def cancel_compare(self):
+        if self.batch_worker is not None:
+            self.batch_worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            return
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_btn.setEnabled(False)
+            self.counters.setText(self.counters.text() + "  (cancelling…)")
+
+    def _on_total(self, total: int):
+        self.progress.setRange(0, max(total, 1))
+        self.progress.setValue(0)
+
+    def _on_rows(self, rows):
+        items = []
         for row in rows:
             it = QTreeWidgetItem([row["relpath"], str(row["left_size"]), str(row["right_size"]), row["status"]])
-            self.tree.addTopLevelItem(it)
+            items.append(it)
+            self._items[row["relpath"]] = it
+            self._counts[row["status"]] = self._counts.get(row["status"], 0) + 1
+        self._rows.extend(rows)
+        self.tree.addTopLevelItems(items)
+        self.progress.setValue(self.progress.value() + len(rows))
+        self._show_counts()
+
+    def _show_counts(self, suffix: str = ""):
+        done = sum(self._counts.values())
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        parts = [f"{k}: {v}" for k, v in sorted(self._counts.items())]
+        self.counters.setText("  ".join(parts + [f"{done / elapsed:,.0f} files/s"]) + suffix)
+
+    def _compare_done(self):
+        self.worker = None
+        self.run_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.progress.setVisible(False)
+        self.tree.setSortingEnabled(True)
+        self.tree.sortByColumn(0, Qt.AscendingOrder)
+
+    def _on_finished(self, cancelled: bool):
+        self._compare_done()
+        self._show_counts("  (cancelled)" if cancelled else "")
+        self.batch_btn.setEnabled(self._counts.get("Different", 0) > 0)
+        if (not cancelled and self.moves_check.isChecked()
+                and self._counts.get("Left only") and self._counts.get("Right only")):
+            one_sided = [r for r in self._rows if r["status"] in ("Left only", "Right only")]
+            worker = MoveDetectWorker(one_sided, self.settings or AppSettings())
+            worker.signals.done.connect(lambda moved, w=worker: self._on_moves(w, moved))
+            worker.signals.failed.connect(lambda msg, w=worker: self._on_moves_failed(w, msg))
+            self._move_worker = worker
+            self.counters.setText(self.counters.text() + "  (detecting moves…)")
+            QThreadPool.globalInstance().start(worker)
+
+    def _on_moves_failed(self, worker, msg: str):
+        if worker is not self._move_worker:
+            return
+        self._move_worker = None
+        QMessageBox.warning(self, "Move detection failed", msg)
+
+    def _on_moves(self, worker, moved):
+        if worker is not self._move_worker:
+            return          # from an earlier compare; its rows are gone
+        self._move_worker = None
+        for m in moved:
+            for rel in (m["left_relpath"], m["right_relpath"]):
+                it = self._items.pop(rel, None)
+                if it is not None:
+                    self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(it))
+            for side in ("Left only", "Right only"):
+                self._counts[side] -= 1
+            self._counts[m["status"]] = self._counts.get(m["status"], 0) + 1
+            self.tree.addTopLevelItem(QTreeWidgetItem([m["relpath"], str(m["left_size"]), str(m["right_size"]),
+                                                       f"{m['status']} ({m['similarity']}%)"]))
+        self._counts = {k: v for k, v in self._counts.items() if v}
+        self._show_counts()
+
+    def run_batch_diff(self):
+        different = [r for r in self._rows if r["status"] == "Different"]
+        if not different or self.batch_worker is not None:
+            return
+        report, _ = QFileDialog.getSaveFileName(self, "Save combined diff report (cancel to skip)",
+                                                "batch-diff.html", "HTML (*.html)")
+        worker = BatchDiffWorker(different, self.settings or AppSettings(), report or None)
+        worker.signals.result.connect(self._on_batch_result)
+        worker.signals.finished.connect(self._on_batch_finished)
+        self.batch_worker = worker
+        self.progress.setRange(0, len(different))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.run_btn.setEnabled(False)
+        self.batch_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_batch_result(self, res: dict):
+        it = self._items.get(res["relpath"])
+        if it is not None:
+            it.setText(4, change_summary(res))
+        self.progress.setValue(self.progress.value() + 1)
+
+    def _on_batch_finished(self, summary: str):
+        self.batch_worker = None
+        self.progress.setVisible(False)
+        self.run_btn.setEnabled(True)
+        self.batch_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+        self.counters.setText(summary)
+
+    def _on_failed(self, msg: str):
+        self._compare_done()
+        QMessageBox.critical(self, "Compare failed", msg)
 
 class MergeDialog(QDialog):
     def __init__(self, local_path, remote_path, base_path=None, merged_path=None, parent=None):
@@ -264,6 +625,47 @@ class SettingsDialog(QDialog):
         self.ignore_ws.setChecked(self._settings.ignore_whitespace)
         layout.addWidget(self.ignore_ws)
 
+        # Text diff algorithm
+        algo_row = QHBoxLayout()
+        algo_row.addWidget(QLabel("Diff algorithm:"))
+        self.algo_combo = QComboBox()
+        self.algo_combo.addItems(list(DIFF_ALGORITHMS))
+        self.algo_combo.setCurrentText(self._settings.diff_algorithm)
+        algo_row.addWidget(self.algo_combo)
+        layout.addLayout(algo_row)
+
+        # Intra-line highlighting
+        intra_row = QHBoxLayout()
+        intra_row.addWidget(QLabel("Intra-line changes:"))
+        self.intra_combo = QComboBox()
+        self.intra_combo.addItems(list(INTRALINE_MODES))
+        self.intra_combo.setCurrentText(self._settings.intraline)
+        intra_row.addWidget(self.intra_combo)
+        layout.addLayout(intra_row)
+
+        # Text diff budget
+        budget_row = QHBoxLayout()
+        budget_row.addWidget(QLabel("Diff time budget (s, 0 = none):"))
+        self.timeout_spin = QDoubleSpinBox()
+        self.timeout_spin.setRange(0, 600)
+        self.timeout_spin.setValue(self._settings.diff_timeout)
+        budget_row.addWidget(self.timeout_spin)
+        budget_row.addWidget(QLabel("Max edit cost (0 = none):"))
+        self.cost_spin = QSpinBox()
+        self.cost_spin.setRange(0, 10_000_000)
+        self.cost_spin.setValue(self._settings.diff_max_cost)
+        budget_row.addWidget(self.cost_spin)
+        layout.addLayout(budget_row)
+
+        # Diff result cache
+        cache_row = QHBoxLayout()
+        cache_row.addWidget(QLabel("Diff cache size (MB, 0 = off):"))
+        self.cache_spin = QSpinBox()
+        self.cache_spin.setRange(0, 65536)
+        self.cache_spin.setValue(self._settings.diff_cache_mb)
+        cache_row.addWidget(self.cache_spin)
+        layout.addLayout(cache_row)
+
         # Hex bytes per row
         hex_row = QHBoxLayout()
         hex_row.addWidget(QLabel("Hex bytes per row:"))
@@ -273,6 +675,39 @@ class SettingsDialog(QDialog):
         hex_row.addWidget(self.bpr_spin)
         layout.addLayout(hex_row)
 
+        # Folder compare hashing threads
+        hash_row = QHBoxLayout()
+        hash_row.addWidget(QLabel("Hashing threads (0 = auto):"))
+        self.hash_workers_spin = QSpinBox()
+        self.hash_workers_spin.setRange(0, 256)
+        self.hash_workers_spin.setValue(self._settings.hash_workers)
+        hash_row.addWidget(self.hash_workers_spin)
+        hash_row.addWidget(QLabel("Hash index entries (0 = off):"))
+        self.hash_index_spin = QSpinBox()
+        self.hash_index_spin.setRange(0, 100_000_000)
+        self.hash_index_spin.setValue(self._settings.hash_index_entries)
+        hash_row.addWidget(self.hash_index_spin)
+        layout.addLayout(hash_row)
+
+        # Folder compare size / age filters (patterns are edited in the folder tab)
+        filter_row = QHBoxLayout()
+        filter_row.addWidget(QLabel("Skip files smaller than (bytes):"))
+        self.min_size_spin = QSpinBox()
+        self.min_size_spin.setRange(0, 2_000_000_000)
+        self.min_size_spin.setValue(self._settings.filter_min_size)
+        filter_row.addWidget(self.min_size_spin)
+        filter_row.addWidget(QLabel("larger than (0 = none):"))
+        self.max_size_spin = QSpinBox()
+        self.max_size_spin.setRange(0, 2_000_000_000)
+        self.max_size_spin.setValue(self._settings.filter_max_size)
+        filter_row.addWidget(self.max_size_spin)
+        filter_row.addWidget(QLabel("older than (days, 0 = none):"))
+        self.max_age_spin = QDoubleSpinBox()
+        self.max_age_spin.setRange(0, 100_000)
+        self.max_age_spin.setValue(self._settings.filter_max_age_days)
+        filter_row.addWidget(self.max_age_spin)
+        layout.addLayout(filter_row)
+
         buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         buttons.accepted.connect(self.accept)
         buttons.rejected.connect(self.reject)
@@ -284,7 +719,17 @@ class SettingsDialog(QDialog):
     def accept(self):
         self._settings.theme = self.theme_combo.currentText()
         self._settings.ignore_whitespace = self.ignore_ws.isChecked()
+        self._settings.diff_algorithm = self.algo_combo.currentText()
+        self._settings.intraline = self.intra_combo.currentText()
+        self._settings.diff_timeout = self.timeout_spin.value()
+        self._settings.diff_max_cost = self.cost_spin.value()
+        self._settings.diff_cache_mb = self.cache_spin.value()
         self._settings.bytes_per_row = self.bpr_spin.value()
+        self._settings.hash_workers = self.hash_workers_spin.value()
+        self._settings.hash_index_entries = self.hash_index_spin.value()
+        self._settings.filter_min_size = self.min_size_spin.value()
+        self._settings.filter_max_size = self.max_size_spin.value()
+        self._settings.filter_max_age_days = self.max_age_spin.value()
         save_settings(self._settings)
         super().accept()
 
@@ -304,8 +749,8 @@ class MainWindow(QWidget):
         layout.addLayout(top_bar)
 
         self.tabs = QTabWidget()
-        self.folder_tab = FolderCompareWidget()
-        self.file_tab = FileDiffWidget()
+        self.folder_tab = FolderCompareWidget(settings=self.settings)
+        self.file_tab = FileDiffWidget(settings=self.settings)
         self.hex_tab = HexDiffViewer(settings=self.settings)
         self.tabs.addTab(self.folder_tab, "Folder Compare")
         self.tabs.addTab(self.file_tab, "File Diff")
@@ -383,6 +828,7 @@ def run_gui_with_args(cli_args):
     return 0
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()    # batch diff workers in a frozen (PyInstaller) build
     cli_args = parse_cli()
     rc = run_gui_with_args(cli_args)
     sys.exit(rc)
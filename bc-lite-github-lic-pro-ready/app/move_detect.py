@@ -0,0 +1,168 @@
+"""
+Move / rename detection over folder compare rows.
+
+A file moved from a/x.cfg to b/x.cfg shows up as one "Left only" and one
+"Right only" row. detect_moves pairs such rows up:
+
+- exact: non-empty one-sided files whose size also occurs on the other
+  side are hashed and joined on (size, digest);
+- near: the remaining text files get a MinHash signature over a sample
+  of their line-pair shingles, and an LSH index (bands of the signature)
+  proposes candidate pairs, so files are never compared all against all.
+  Candidates whose estimated similarity reaches min_similarity are
+  matched best-first, one to one.
+
+Matched pairs become a single "Moved" (same file name) or "Renamed" row
+with a "similarity" percentage and the two original relative paths.
+"""
+import heapq
+import os
+import random
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .folder_compare import FileEntry, hash_entries
+except ImportError:
+    from folder_compare import FileEntry, hash_entries
+
+NUM_PERM = 64
+BANDS = 16                      # 16 bands x 4 rows: pairs near 50% similar become candidates
+ROWS_PER_BAND = NUM_PERM // BANDS
+MAX_SHINGLES = 1024             # bottom-k sample of each file's shingles
+NEAR_MAX_BYTES = 8 * 1024 * 1024
+BINARY_SNIFF = 8192
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5eed)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+def _shingles(path: str) -> Optional[List[int]]:
+    """Bottom-k sample of the CRC-32s of consecutive line pairs, None for binary/empty files."""
+    with open(path, "rb") as fp:
+        data = fp.read(NEAR_MAX_BYTES + 1)
+    if not data or len(data) > NEAR_MAX_BYTES or b"\0" in data[:BINARY_SNIFF]:
+        return None
+    lines = data.splitlines()
+    if len(lines) == 1:
+        return [zlib.crc32(lines[0])]
+    seen = {zlib.crc32(lines[i + 1], zlib.crc32(lines[i])) for i in range(len(lines) - 1)}
+    return heapq.nsmallest(MAX_SHINGLES, seen) if len(seen) > MAX_SHINGLES else list(seen)
+
+def minhash_signature(shingles: Sequence[int]) -> Tuple[int, ...]:
+    return tuple(min((a * x + b) % _PRIME for x in shingles) for a, b in _PERMS)
+
+def estimate_similarity(sig_a: Sequence[int], sig_b: Sequence[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+def _moved_row(left: dict, right: dict, similarity: float) -> dict:
+    same_name = os.path.basename(left["relpath"]) == os.path.basename(right["relpath"])
+    return {
+        "relpath": f"{left['relpath']} → {right['relpath']}",
+        "left_size": left["left_size"],
+        "right_size": right["right_size"],
+        "status": "Moved" if same_name else "Renamed",
+        "left_path": left["left_path"],
+        "right_path": right["right_path"],
+        "similarity": round(similarity * 100),
+        "left_relpath": left["relpath"],
+        "right_relpath": right["relpath"],
+    }
+
+def _exact_matches(lefts: List[dict], rights: List[dict], hash_algorithm: str,
+                   hash_workers: Optional[int], hash_index) -> List[Tuple[dict, dict]]:
+    # empty files are all identical, so like git they are never paired as moves
+    right_sizes = {r["right_size"] for r in rights if r["right_size"]}
+    left_sizes = {r["left_size"] for r in lefts if r["left_size"]}
+    entries = {}
+    for r in lefts:
+        if r["left_size"] in right_sizes:
+            entries[id(r)] = FileEntry(r["left_path"], r["relpath"], r["left_size"], 0.0)
+    for r in rights:
+        if r["right_size"] in left_sizes:
+            entries[id(r)] = FileEntry(r["right_path"], r["relpath"], r["right_size"], 0.0)
+    hash_entries(list(entries.values()), hash_workers, index=hash_index, algorithm=hash_algorithm)
+
+    by_digest: Dict[tuple, List[dict]] = defaultdict(list)
+    for r in rights:
+        e = entries.get(id(r))
+        if e is not None and e.hash is not None:
+            by_digest[(e.size, e.hash)].append(r)
+    pairs = []
+    for l in lefts:
+        e = entries.get(id(l))
+        if e is None or e.hash is None:
+            continue
+        bucket = by_digest.get((e.size, e.hash))
+        if not bucket:
+            continue
+        # among identical copies, prefer the one that kept its file name
+        name = os.path.basename(l["relpath"])
+        k = next((i for i, r in enumerate(bucket) if os.path.basename(r["relpath"]) == name), 0)
+        pairs.append((l, bucket.pop(k)))
+    return pairs
+
+def _near_matches(lefts: List[dict], rights: List[dict], min_similarity: float) -> List[Tuple[dict, dict, float]]:
+    sigs = {}
+    for r, key in [(r, "left_path") for r in lefts] + [(r, "right_path") for r in rights]:
+        try:
+            sh = _shingles(r[key])
+        except OSError:
+            continue
+        if sh:
+            sigs[id(r)] = minhash_signature(sh)
+    buckets = defaultdict(list)
+    for r in rights:
+        sig = sigs.get(id(r))
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            buckets[(band, sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])].append(r)
+    candidates = {}
+    for l in lefts:
+        sig = sigs.get(id(l))
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            for r in buckets.get((band, sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]), ()):
+                key = (id(l), id(r))
+                if key not in candidates:
+                    sim = estimate_similarity(sig, sigs[id(r)])
+                    if sim >= min_similarity:
+                        candidates[key] = (sim, l, r)
+    used = set()
+    pairs = []
+    for sim, l, r in sorted(candidates.values(), key=lambda c: -c[0]):
+        if id(l) in used or id(r) in used:
+            continue
+        used.add(id(l))
+        used.add(id(r))
+        pairs.append((l, r, sim))
+    return pairs
+
+def detect_moves(rows: Sequence[dict], min_similarity: float = 0.5, near: bool = True,
+                 hash_algorithm: str = "sha256", hash_workers: Optional[int] = None,
+                 hash_index=None) -> Tuple[List[dict], List[dict]]:
+    """
+    Pair up the "Left only" and "Right only" rows of a folder compare.
+    Returns (moved rows, one-sided rows left unmatched). With near=False
+    only byte-identical files are paired.
+    """
+    lefts = [r for r in rows if r["status"] == "Left only"]
+    rights = [r for r in rows if r["status"] == "Right only"]
+    if not lefts or not rights:
+        return [], lefts + rights
+    moved = []
+    matched = set()
+    for l, r in _exact_matches(lefts, rights, hash_algorithm, hash_workers, hash_index):
+        moved.append(_moved_row(l, r, 1.0))
+        matched.update((id(l), id(r)))
+    if near:
+        rest_l = [r for r in lefts if id(r) not in matched]
+        rest_r = [r for r in rights if id(r) not in matched]
+        if rest_l and rest_r:
+            for l, r, sim in _near_matches(rest_l, rest_r, min_similarity):
+                moved.append(_moved_row(l, r, sim))
+                matched.update((id(l), id(r)))
+    unmatched = [r for r in lefts + rights if id(r) not in matched]
+    return moved, unmatched
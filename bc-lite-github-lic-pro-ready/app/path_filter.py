@@ -0,0 +1,127 @@
+"""
+Include/exclude rules for BC-Lite folder compare.
+
+Exclude patterns follow .gitignore syntax: '#' comments, '!' to
+re-include, a trailing '/' for directories only, a leading or inner '/'
+to anchor the pattern to the compared root, '*' and '?' within one path
+component and '**' across components. A pattern without a slash matches
+a name at any depth. All rules are compiled into one regular expression
+(alternatives in reverse order, so the first alternative that matches is
+the last matching rule, as in git), so a path costs one match however
+many rules there are. Excluded directories are pruned by the walker
+before it descends into them.
+"""
+import os
+import re
+import time
+from typing import Iterable, List, Optional, Tuple
+
+def split_patterns(text: str) -> List[str]:
+    """Patterns from a ';' or newline separated settings string."""
+    return [p.strip() for p in re.split(r"[;\n]", text or "") if p.strip()]
+
+def _translate(pattern: str) -> str:
+    """Regex source for one gitignore-style pattern, matched against a '/'-separated path."""
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern.startswith("**", i):
+                i += 2
+                if i < n and pattern[i] == "/":
+                    out.append("(?:.*/)?")      # '**/' : zero or more directories
+                    i += 1
+                else:
+                    out.append(".*")
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    body = "".join(out)
+    return body if anchored else "(?:.*/)?" + body
+
+def _compile(rules: List[Tuple[str, bool]]):
+    """One regex over (regex source, negated) rules; group names carry the rule index."""
+    if not rules:
+        return None, []
+    alts = [f"(?P<r{k}>{src})" for k, (src, _) in reversed(list(enumerate(rules)))]
+    return re.compile("|".join(alts), re.DOTALL), [neg for _, neg in rules]
+
+class PathFilter:
+    def __init__(self, exclude: Iterable[str] = (), include: Iterable[str] = (),
+                 min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 max_age_days: Optional[float] = None):
+        """
+        exclude: gitignore-style patterns for files and directories to skip
+        include: if given, only files matching one of these are kept
+        min_size / max_size: file size bounds in bytes
+        max_age_days: only keep files modified within this many days
+        """
+        file_rules, dir_rules = [], []
+        for pat in exclude:
+            pat = pat.strip()
+            if not pat or pat.startswith("#"):
+                continue
+            negated = pat.startswith("!")
+            if negated:
+                pat = pat[1:]
+            dir_only = pat.endswith("/")
+            src = _translate(pat.rstrip("/"))
+            dir_rules.append((src, negated))
+            if not dir_only:
+                file_rules.append((src, negated))
+        self._files, self._file_neg = _compile(file_rules)
+        self._dirs, self._dir_neg = _compile(dir_rules)
+        includes = [_translate(p.strip().rstrip("/")) for p in include if p.strip()]
+        self._include = re.compile("|".join(includes), re.DOTALL) if includes else None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.min_mtime = time.time() - max_age_days * 86400 if max_age_days else None
+
+    def __bool__(self) -> bool:
+        return bool(self._files or self._dirs or self._include or self.min_size
+                    or self.max_size or self.min_mtime)
+
+    @staticmethod
+    def _norm(rel: str) -> str:
+        return rel.replace(os.sep, "/") if os.sep != "/" else rel
+
+    @staticmethod
+    def _excluded(rx, negated, path: str) -> bool:
+        if rx is None:
+            return False
+        m = rx.fullmatch(path)
+        return m is not None and not negated[int(m.lastgroup[1:])]
+
+    def excludes_dir(self, rel: str) -> bool:
+        return self._excluded(self._dirs, self._dir_neg, self._norm(rel))
+
+    def excludes_name(self, rel: str) -> bool:
+        """Path rules only, so the walker can skip a file before stat()ing it."""
+        path = self._norm(rel)
+        if self._excluded(self._files, self._file_neg, path):
+            return True
+        return self._include is not None and self._include.fullmatch(path) is None
+
+    def excludes_stat(self, size: int, mtime: float) -> bool:
+        if self.min_size is not None and size < self.min_size:
+            return True
+        if self.max_size is not None and size > self.max_size:
+            return True
+        return self.min_mtime is not None and mtime < self.min_mtime
@@ -10,7 +10,19 @@ CONFIG_PATH = CONFIG_DIR / "config.json"
 class AppSettings:
     theme: str = "system"          # system | light | dark (future)
     ignore_whitespace: bool = False
+    diff_algorithm: str = "myers"  # myers | patience | histogram
+    intraline: str = "word"        # word | char | off: highlight changes inside changed lines
+    diff_timeout: float = 5.0      # seconds before text diff falls back to an approximate result
+    diff_max_cost: int = 20000     # edit-distance cap for the exact Myers search
+    diff_cache_mb: int = 256       # on-disk diff result cache in CONFIG_DIR, 0 disables
     bytes_per_row: int = 16        # hex viewer bytes per row
+    hash_workers: int = 0          # folder compare hashing threads, 0 = auto
+    hash_index_entries: int = 2_000_000  # persistent file-hash index rows in CONFIG_DIR, 0 disables
+    exclude_patterns: str = ""     # folder compare: gitignore-style excludes, ';'-separated
+    include_patterns: str = ""     # folder compare: only files matching these, ';'-separated
+    filter_min_size: int = 0       # folder compare: skip smaller files (bytes), 0 = no bound
+    filter_max_size: int = 0       # folder compare: skip larger files (bytes), 0 = no bound
+    filter_max_age_days: float = 0.0  # folder compare: skip files not modified within N days, 0 = off
 
 def load_settings() -> AppSettings:
     try:
@@ -1,41 +1,115 @@
-from typing import List
+"""
+Three-way line merge (diff3) for BC-Lite.
+
+base->left and base->right are diffed with the project's diff engine.
+The two lists of change hunks are then walked together in base order.
+Changes whose base ranges overlap, or that start at the same base line
+(two insertions at one spot), are grouped. Changes that merely touch
+are applied one after the other. A group that only one side changed
+takes that side, and a group both sides changed identically is taken
+once. Anything else is a conflict, and left vs right is diffed again
+inside it so that only the lines that really differ get markers. The
+merge itself is linear in the number of hunks.
+"""
+from typing import List, Sequence, Tuple
+
+try:
+    from .diff import Hunk, compute_diff
+except ImportError:
+    from diff import Hunk, compute_diff
 
 CONFLICT_START = "<<<<<<< LEFT\n"
 CONFLICT_MID = "=======\n"
 CONFLICT_END = ">>>>>>> RIGHT\n"
 
-def _diff3(base: List[str], left: List[str], right: List[str]) -> List[str]:
+def _changes(base: Sequence[str], other: Sequence[str], algorithm: str) -> List[Hunk]:
+    return list(compute_diff(base, other, algorithm).changes())
+
+def _side_range(hunks: List[Hunk], lo: int, hi: int, start: int, end: int, delta: int) -> Tuple[int, int]:
     """
-    Very small, naive diff3-like merge.
+    Lines of one side standing for base[start:end]: hunks[lo:hi] are its
+    changes inside that range, `delta` its line offset against base before it.
     """
-    out = []
+    if lo == hi:
+        return start + delta, end + delta
+    first, last = hunks[lo], hunks[hi - 1]
+    return first.b_start - (first.a_start - start), last.b_end + (end - last.a_end)
+
+def _emit(out: List[str], lines: Sequence[str]):
+    """Append lines, first ending a last line that lacks its newline so they do not join it."""
+    if lines and out and not out[-1].endswith("\n"):
+        out[-1] += "\n"
+    out.extend(lines)
+
+def _emit_block(out: List[str], lines: Sequence[str]):
+    _emit(out, lines)
+    if lines and not lines[-1].endswith("\n"):
+        out.append("\n")        # keep the marker that follows on its own line
+
+def _emit_conflict(out: List[str], left: Sequence[str], right: Sequence[str], algorithm: str) -> int:
+    """Markers around only the parts of left/right that differ; returns the conflict count."""
+    conflicts = 0
+    for h in compute_diff(left, right, algorithm):
+        if h.tag == "equal":
+            _emit(out, left[h.a_start:h.a_end])
+            continue
+        conflicts += 1
+        _emit(out, [CONFLICT_START])
+        _emit_block(out, left[h.a_start:h.a_end])
+        out.append(CONFLICT_MID)
+        _emit_block(out, right[h.b_start:h.b_end])
+        out.append(CONFLICT_END)
+    return conflicts
+
+def merge_lines(base: Sequence[str], left: Sequence[str], right: Sequence[str],
+                algorithm: str = "myers") -> Tuple[List[str], int]:
+    """
+    diff3 merge of line lists (keepends). Returns the merged lines and
+    the number of conflict blocks in them.
+    """
+    lh = _changes(base, left, algorithm)
+    rh = _changes(base, right, algorithm)
+    out: List[str] = []
+    conflicts = 0
+    pos = 0                     # base lines before pos are merged
+    dl = dr = 0                 # line offset of left/right against base at pos
     i = j = 0
-    while i < len(left) or j < len(right):
-        l = left[i] if i < len(left) else None
-        r = right[j] if j < len(right) else None
-        if l == r:
-            out.append(l if l is not None else "")
-            i += (i < len(left))
-            j += (j < len(right))
-        elif l is None:
-            out.append(r)
-            j += 1
-        elif r is None:
-            out.append(l)
-            i += 1
+    while i < len(lh) or j < len(rh):
+        # a group starts at the earlier change and takes in every change overlapping it
+        if j >= len(rh) or (i < len(lh) and lh[i].a_start <= rh[j].a_start):
+            start, end = lh[i].a_start, lh[i].a_end
         else:
-            out.append(CONFLICT_START)
-            out.append(l)
-            out.append(CONFLICT_MID)
-            out.append(r)
-            out.append(CONFLICT_END)
-            i += 1
-            j += 1
-    return out
-
-def merge_text(base_text: str, left_text: str, right_text: str) -> str:
+            start, end = rh[j].a_start, rh[j].a_end
+        i2, j2 = i, j
+        while True:
+            if i2 < len(lh) and (lh[i2].a_start < end or lh[i2].a_start == start):
+                end = max(end, lh[i2].a_end)
+                i2 += 1
+            elif j2 < len(rh) and (rh[j2].a_start < end or rh[j2].a_start == start):
+                end = max(end, rh[j2].a_end)
+                j2 += 1
+            else:
+                break
+        _emit(out, base[pos:start])
+        ls, le = _side_range(lh, i, i2, start, end, dl)
+        rs, re_ = _side_range(rh, j, j2, start, end, dr)
+        if i == i2:
+            _emit(out, right[rs:re_])
+        elif j == j2:
+            _emit(out, left[ls:le])
+        elif left[ls:le] == right[rs:re_]:
+            _emit(out, left[ls:le])
+        else:
+            conflicts += _emit_conflict(out, left[ls:le], right[rs:re_], algorithm)
+        dl, dr = le - end, re_ - end
+        pos = end
+        i, j = i2, j2
+    _emit(out, base[pos:])
+    return out, conflicts
+
+def merge_text(base_text: str, left_text: str, right_text: str, algorithm: str = "myers") -> str:
     base = base_text.splitlines(keepends=True)
     left = left_text.splitlines(keepends=True)
     right = right_text.splitlines(keepends=True)
-    merged = _diff3(base, left, right)
+    merged, _ = merge_lines(base, left, right, algorithm)
     return "".join(merged)
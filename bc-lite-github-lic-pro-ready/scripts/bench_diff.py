@@ -0,0 +1,67 @@
+import argparse
+import random
+import time
+from pathlib import Path
+from app.diff import DIFF_ALGORITHMS, compute_diff
+
+def synthetic_pair(lines: int, edits: int, seed: int = 0):
+    """
+    Build a source-like file and a copy with `edits` random line edits,
+    insertions, deletions and moved blocks.
+    """
+    rng = random.Random(seed)
+    common = ["{", "}", "", "return None", "pass", "else:"]
+    a = []
+    for i in range(lines):
+        if rng.random() < 0.3:
+            a.append(rng.choice(common))
+        else:
+            a.append(f"    value_{i} = compute({rng.randint(0, 1 << 20)})")
+    b = list(a)
+    for _ in range(edits):
+        op = rng.random()
+        i = rng.randrange(max(1, len(b)))
+        if op < 0.4:
+            b[i:i + 1] = [b[i] + "  # changed"] if b else []
+        elif op < 0.7:
+            b.insert(i, f"    inserted_{rng.randint(0, 1 << 20)}()")
+        elif op < 0.9:
+            del b[i:i + rng.randint(1, 5)]
+        else:
+            block = b[i:i + 10]
+            del b[i:i + 10]
+            j = rng.randrange(max(1, len(b)))
+            b[j:j] = block
+    return a, b
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare BC-Lite text diff algorithms on the same inputs")
+    ap.add_argument("--left", help="Left text file (default: synthetic input)")
+    ap.add_argument("--right", help="Right text file (default: synthetic input)")
+    ap.add_argument("--lines", type=int, default=50000, help="Synthetic file length")
+    ap.add_argument("--edits", type=int, default=500, help="Synthetic edit count")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per algorithm (best time is reported)")
+    args = ap.parse_args()
+
+    if args.left and args.right:
+        a = Path(args.left).read_text(encoding="utf-8", errors="ignore").splitlines()
+        b = Path(args.right).read_text(encoding="utf-8", errors="ignore").splitlines()
+    else:
+        a, b = synthetic_pair(args.lines, args.edits)
+
+    print(f"{len(a)} vs {len(b)} lines")
+    print(f"{'algorithm':<10} {'best s':>9} {'changed':>9} {'hunks':>7}")
+    for algorithm in DIFF_ALGORITHMS:
+        best = None
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            result = compute_diff(a, b, algorithm)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        changes = list(result.changes())
+        changed = sum((h.a_end - h.a_start) + (h.b_end - h.b_start) for h in changes)
+        hunks = len(changes)
+        print(f"{algorithm:<10} {best:>9.3f} {changed:>9} {hunks:>7}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from app.batch_diff import iter_batch_diff, write_batch_report
+from app.folder_compare import HASH_ALGORITHMS, iter_compare_dirs
+from app.hash_index import HashIndex
+from app.move_detect import detect_moves
+from app.path_filter import PathFilter
+
+FIELDS = ["relpath", "status", "left_size", "right_size", "left_path", "right_path"]
+MOVE_FIELDS = FIELDS + ["similarity"]
+
+# exit codes, as in diff(1)
+EXIT_SAME, EXIT_DIFFERENT, EXIT_ERROR = 0, 1, 2
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description="BC-Lite headless folder compare")
+    ap.add_argument("--left", required=True, help="Left folder")
+    ap.add_argument("--right", required=True, help="Right folder")
+    ap.add_argument("--mode", choices=["size_time", "content", "bytes"], default="size_time",
+                    help="How files present on both sides are compared")
+    ap.add_argument("--hash", choices=["none"] + list(HASH_ALGORITHMS), default="sha256",
+                    help="Hash algorithm for --mode content (none: only sizes are compared)")
+    ap.add_argument("--hash-index", action="store_true",
+                    help="Reuse digests of unchanged files from ~/.bc-lite/hash-index.sqlite")
+    ap.add_argument("--workers", type=int, help="Threads scanning the folders")
+    ap.add_argument("--hash-workers", type=int, help="Threads hashing / comparing file contents")
+    ap.add_argument("--exclude", action="append", default=[],
+                    help="gitignore-style pattern to skip (repeatable), e.g. .git/ or '*.pyc'")
+    ap.add_argument("--include", action="append", default=[],
+                    help="Only compare files matching this pattern (repeatable)")
+    ap.add_argument("--min-size", type=int, help="Skip files smaller than this many bytes")
+    ap.add_argument("--max-size", type=int, help="Skip files larger than this many bytes")
+    ap.add_argument("--max-age-days", type=float, help="Skip files not modified within this many days")
+    ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Row output format")
+    ap.add_argument("--out", help="Output file (default: stdout)")
+    ap.add_argument("--all", action="store_true", help="Also write Equal rows")
+    ap.add_argument("--detect-moves", action="store_true",
+                    help="Pair up one-sided files as Moved/Renamed (exact and near duplicates)")
+    ap.add_argument("--move-similarity", type=float, default=0.5,
+                    help="Minimum estimated similarity (0-1) for a near-duplicate move")
+    ap.add_argument("--diff-report", help="Text-diff every Different file into this combined HTML report")
+    ap.add_argument("--diff-workers", type=int, help="Processes used for --diff-report (default: CPU count)")
+    ap.add_argument("--diff-timeout", type=float, default=5.0,
+                    help="Seconds per file before its diff falls back to an approximate one")
+    args = ap.parse_args()
+
+    for root in (args.left, args.right):
+        if not os.path.isdir(root):
+            print(f"error: {root}: not a directory", file=sys.stderr)
+            return EXIT_ERROR
+    do_hash = args.mode == "content" and args.hash != "none"
+    path_filter = PathFilter(args.exclude, args.include, args.min_size, args.max_size,
+                             args.max_age_days) or None
+    index = HashIndex() if (do_hash and args.hash_index) else None
+
+    def read_contents(row) -> bool:
+        # only same-size pairs get their contents hashed or compared
+        return args.mode != "size_time" and row["left_size"] == row["right_size"]
+
+    fp = open(args.out, "w", encoding="utf-8", newline="") if args.out else sys.stdout
+    counts = {}
+    different = []
+    one_sided = []
+    read_bytes = 0
+    t0 = time.perf_counter()
+    try:
+        fields = MOVE_FIELDS if args.detect_moves else FIELDS
+        if args.format == "csv":
+            writer = csv.DictWriter(fp, fields, extrasaction="ignore")
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            write = lambda row: fp.write(json.dumps({k: row.get(k) for k in fields}) + "\n")
+        for row in iter_compare_dirs(args.left, args.right, args.mode, do_hash=do_hash,
+                                     workers=args.workers, hash_workers=args.hash_workers,
+                                     hash_index=index,
+                                     hash_algorithm=args.hash if do_hash else "sha256",
+                                     path_filter=path_filter):
+            if row["status"] in ("Equal", "Different") and read_contents(row):
+                read_bytes += row["left_size"] + row["right_size"]
+            if args.detect_moves and row["status"] in ("Left only", "Right only"):
+                one_sided.append(row)     # written once moves are known
+                continue
+            counts[row["status"]] = counts.get(row["status"], 0) + 1
+            if args.all or row["status"] != "Equal":
+                write(row)
+            if args.diff_report and row["status"] == "Different":
+                different.append(row)
+        if one_sided:
+            moved, unmatched = detect_moves(one_sided, args.move_similarity, hash_workers=args.hash_workers,
+                                            hash_index=index)
+            for row in moved + unmatched:
+                counts[row["status"]] = counts.get(row["status"], 0) + 1
+                write(row)
+    except OSError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+        if index is not None:
+            index.close()
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    files = sum(counts.values())
+    summary = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items())) or "no files"
+    print(f"{files} files in {elapsed:.2f}s ({files / elapsed:,.0f} files/s, "
+          f"{read_bytes / elapsed / 1e6:,.1f} MB/s) - {summary}", file=sys.stderr)
+    if args.diff_report:
+        with open(args.diff_report, "w", encoding="utf-8") as rp:
+            totals = write_batch_report(iter_batch_diff(different, args.diff_workers,
+                                                        timeout=args.diff_timeout, report=True), rp)
+        print(f"Wrote {args.diff_report}: {totals['files']} files, "
+              f"+{totals['added']} -{totals['removed']} lines", file=sys.stderr)
+    if counts.get("Unreadable"):
+        return EXIT_ERROR
+    return EXIT_SAME if files == counts.get("Equal", 0) else EXIT_DIFFERENT
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,85 @@
 import argparse
+import itertools
+import os
+import sys
+import time
 from pathlib import Path
-from app.diff import diff_as_html
+from app.binary_diff import iter_file_regions, iter_hex_html_rows, iter_hex_rows, iter_hex_text
+from app.diff import DIFF_ALGORITHMS, INTRALINE_MODES, DiffBudget, compute_diff, iter_html_sections, write_html_report
+
+def read_lines(path: str):
+    with open(path, encoding="utf-8", errors="ignore") as fp:
+        return [line.rstrip("\n") for line in fp]
+
+def binary_report(args) -> None:
+    """Stream the rows where two binaries differ (equal offsets) as text or HTML."""
+    size_a, size_b = os.path.getsize(args.left), os.path.getsize(args.right)
+    stats = {"regions": 0, "bytes": 0, "rows": 0}
+
+    def regions():
+        for start, end in iter_file_regions(args.left, args.right):
+            stats["regions"] += 1
+            stats["bytes"] += end - start
+            yield start, end
+
+    def counted(rows):
+        for row in rows:
+            stats["rows"] += row[0] == "!"
+            yield row
+
+    context = args.context if args.context >= 0 else sys.maxsize
+    rows = counted(iter_hex_rows(args.left, args.right, regions(), args.bytes_per_row, context))
+    t0 = time.perf_counter()
+    fp = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        if args.format == "text":
+            fp.write(f"--- {args.left} ({size_a:,} bytes)\n+++ {args.right} ({size_b:,} bytes)\n")
+            fp.writelines(iter_hex_text(rows, args.bytes_per_row))
+        else:
+            heading = f"{Path(args.left).name} ({size_a:,} bytes) vs {Path(args.right).name} ({size_b:,} bytes)"
+            body = itertools.chain(["<table style='font-family: monospace'>\n"],
+                                   iter_hex_html_rows(rows, args.bytes_per_row), ["</table>\n"])
+            fp.writelines(iter_html_sections([(heading, body)], "BC-Lite Hex Diff"))
+    finally:
+        if fp is not sys.stdout:
+            fp.close()
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    print(f"Wrote {args.out}: {stats['rows']:,} differing rows, {stats['regions']:,} regions, "
+          f"{stats['bytes']:,} bytes differ; {max(size_a, size_b) / 1e6:,.1f} MB in {elapsed:.2f}s "
+          f"({max(size_a, size_b) / elapsed / 1e6:,.1f} MB/s)", file=sys.stderr)
 
 def main():
     ap = argparse.ArgumentParser(description="BC-Lite HTML diff report generator")
-    ap.add_argument("--left", required=True, help="Left text file")
-    ap.add_argument("--right", required=True, help="Right text file")
-    ap.add_argument("--out", required=True, help="Output HTML file")
+    ap.add_argument("--left", required=True, help="Left file")
+    ap.add_argument("--right", required=True, help="Right file")
+    ap.add_argument("--out", required=True, help="Output file ('-' for stdout with --binary)")
+    ap.add_argument("--algorithm", choices=DIFF_ALGORITHMS, default="myers", help="Text diff algorithm")
+    ap.add_argument("--timeout", type=float, help="Seconds before falling back to an approximate diff")
+    ap.add_argument("--max-cost", type=int, help="Edit-distance cap before falling back to an approximate diff")
+    ap.add_argument("--context", type=int, default=3,
+                    help="Unchanged lines (hex rows with --binary) kept around each change (-1 keeps all)")
+    ap.add_argument("--intraline", choices=INTRALINE_MODES, default="word",
+                    help="Highlight word or character changes inside changed lines")
+    ap.add_argument("--binary", action="store_true",
+                    help="Hex-diff the files byte by byte at equal offsets instead of as text")
+    ap.add_argument("--format", choices=["html", "text"], default="html",
+                    help="Report format (text needs --binary)")
+    ap.add_argument("--bytes-per-row", type=int, default=16, help="Bytes per hex row with --binary")
     args = ap.parse_args()
 
-    lt = Path(args.left).read_text(encoding="utf-8", errors="ignore")
-    rt = Path(args.right).read_text(encoding="utf-8", errors="ignore")
-    html = diff_as_html(lt, rt)
-    Path(args.out).write_text(html, encoding="utf-8")
-    print(f"Wrote {args.out}")
+    if args.binary:
+        if args.bytes_per_row < 1:
+            ap.error("--bytes-per-row must be at least 1")
+        binary_report(args)
+        return
+    if args.format != "html" or args.out == "-":
+        ap.error("text output and stdout need --binary")
+
+    budget = DiffBudget(max_cost=args.max_cost, timeout=args.timeout)
+    result = compute_diff(read_lines(args.left), read_lines(args.right), args.algorithm, budget)
+    with open(args.out, "w", encoding="utf-8") as fp:
+        write_html_report(result, fp, args.context, args.intraline)
+    print(f"Wrote {args.out}" + (" (approximate diff)" if result.approximate else ""))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# make the `app` package importable when pytest is run from the repo root
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+@pytest.fixture
+def write():
+    """write(root, rel, data=b"x") creates root/rel and its parents and returns the path."""
+    def _write(root, rel, data=b"x"):
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+        return p
+    return _write
@@ -0,0 +1,54 @@
+import io
+
+from app.batch_diff import diff_file_pair, iter_batch_diff, write_batch_report
+from app.folder_compare import compare_dirs
+
+
+def test_diff_file_pair_stats(tmp_path, write):
+    write(tmp_path, "a.txt", b"one\ntwo\nthree\n")
+    write(tmp_path, "b.txt", b"one\n2\nthree\nfour\n")
+    write(tmp_path, "bin", b"\0\1\2")
+    res = diff_file_pair("x", str(tmp_path / "a.txt"), str(tmp_path / "b.txt"), report=True)
+    assert (res["added"], res["removed"], res["binary"]) == (2, 1, False)
+    assert "four" in res["html"]
+    assert diff_file_pair("x", str(tmp_path / "a.txt"), str(tmp_path / "bin"))["binary"]
+    assert diff_file_pair("x", str(tmp_path / "a.txt"), str(tmp_path / "missing"))["error"]
+
+
+def test_batch_diff_over_folder_compare(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    for i in range(5):
+        write(left, f"f{i}.txt", b"a\nb\n")
+        write(right, f"f{i}.txt", b"a\nb\n" + b"c\n" * i)
+    write(left, "blob", b"\0" * 10)
+    write(right, "blob", b"\0" * 11)
+    rows = compare_dirs(str(left), str(right), "content", do_hash=True)
+    results = list(iter_batch_diff(rows, workers=2, max_pending=2, report=True))
+    by_path = {r["relpath"]: r for r in results}
+    assert set(by_path) == {"f1.txt", "f2.txt", "f3.txt", "f4.txt", "blob"}
+    assert by_path["f3.txt"]["added"] == 3 and by_path["blob"]["binary"]
+
+    out = io.StringIO()
+    totals = write_batch_report(results, out)
+    assert totals == {"files": 5, "added": 10, "removed": 0}
+    html = out.getvalue()
+    assert html.count("<h4>") == 5 and "Binary files differ" in html and html.endswith("</html>")
+
+
+def test_size_cap_and_hard_timeout(tmp_path, write):
+    write(tmp_path, "small.a", b"a\nb\n")
+    write(tmp_path, "small.b", b"a\nc\n")
+    # nothing in common: an unbudgeted Myers search would run for minutes
+    write(tmp_path, "slow.a", b"".join(b"left %d\n" % i for i in range(30000)))
+    write(tmp_path, "slow.b", b"".join(b"right %d\n" % i for i in range(30000)))
+    rows = [{"relpath": name, "status": "Different", "left_path": str(tmp_path / f"{name}.a"),
+             "right_path": str(tmp_path / f"{name}.b")} for name in ("slow", "small")]
+
+    capped = {r["relpath"]: r for r in iter_batch_diff(rows, workers=2, max_bytes=1000)}
+    assert capped["slow"]["error"].startswith("too large")
+    assert capped["small"]["error"] is None
+
+    results = {r["relpath"]: r for r in iter_batch_diff(rows, workers=1, timeout=None, max_bytes=None,
+                                                         hard_timeout=1)}
+    assert "no result after 1s" in results["slow"]["error"]
+    assert (results["small"]["added"], results["small"]["removed"]) == (1, 1)
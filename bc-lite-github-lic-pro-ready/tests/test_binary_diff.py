@@ -0,0 +1,118 @@
+import random
+import threading
+
+from app.binary_diff import (RowLayout, align, ascii_cells, diff_marks, hex_cells, iter_file_regions,
+                             iter_hex_rows, iter_hex_text, regions_to_rows, scan_regions)
+from app.diff import Hunk
+
+
+def test_scan_regions_finds_runs_across_blocks():
+    a = bytearray(range(256)) * 64            # 16 KiB
+    b = bytearray(a)
+    b[3] ^= 1
+    b[100:110] = bytes(10)
+    b[1020:1030] = b"\x80" * 10                # straddles the 1024-byte block edge
+    regions = scan_regions(bytes(a), bytes(b), block=1024)
+    assert list(regions) == [(3, 4), (100, 110), (1020, 1030)]
+    assert regions.total_bytes() == 21
+
+
+def test_scan_regions_length_mismatch_and_navigation():
+    a = b"x" * 5000
+    b = b"x" * 10 + b"y" + b"x" * 4989 + b"tail"
+    regions = scan_regions(a, b, block=512)
+    assert list(regions) == [(10, 11), (5000, 5004)]
+    assert regions.next_after(10) == 1
+    assert regions.next_after(5000) is None
+    assert regions.prev_before(5000) == 0
+    assert regions.prev_before(10) is None
+    assert regions.overlaps(0, 11) and not regions.overlaps(11, 5000)
+
+
+def test_scan_regions_progress_and_cancel():
+    a = bytes(4096)
+    b = bytes(4095) + b"\1"
+    seen = []
+    regions = scan_regions(a, b, block=1024, progress=lambda done, total: seen.append(done))
+    assert seen[-1] == 4096 and list(regions) == [(4095, 4096)]
+    cancel = threading.Event()
+    cancel.set()
+    assert len(scan_regions(a, b, block=1024, cancel=cancel)) == 0
+
+
+def _random_bytes(n, seed=1):
+    return random.Random(seed).randbytes(n)
+
+
+def test_align_finds_insertions_and_deletions():
+    a = _random_bytes(20000)
+    b = a[:10] + b"X" + a[10:9000] + a[9100:]
+    assert align(a, b, block=256) == [
+        Hunk("equal", 0, 10, 0, 10),
+        Hunk("insert", 10, 10, 10, 11),
+        Hunk("equal", 10, 9000, 11, 9001),
+        Hunk("delete", 9000, 9100, 9001, 9001),
+        Hunk("equal", 9100, 20000, 9001, 19901),
+    ]
+
+
+def test_align_replace_and_identical():
+    a = _random_bytes(4096)
+    b = a[:1000] + b"\0" * 20 + a[1020:]
+    assert align(a, b, block=256)[1] == Hunk("replace", 1000, 1020, 1000, 1020)
+    assert align(a, a) == [Hunk("equal", 0, 4096, 0, 4096)]
+    assert align(b"", b"abc") == [Hunk("insert", 0, 0, 0, 3)]
+
+
+def test_align_does_not_anchor_on_repeated_padding():
+    data = _random_bytes(200000)
+    a = data + bytes(16384)
+    b = bytes(4096) + data
+    assert align(a, b, block=512) == [
+        Hunk("insert", 0, 0, 0, 4096),
+        Hunk("equal", 0, 200000, 4096, 204096),
+        Hunk("delete", 200000, 216384, 204096, 204096),
+    ]
+
+
+def test_row_layout_aligns_hunks():
+    hunks = [Hunk("equal", 0, 20, 0, 20), Hunk("insert", 20, 20, 20, 23), Hunk("equal", 20, 36, 23, 39)]
+    layout = RowLayout(hunks, 16)
+    assert layout.rows == 2 + 1 + 1
+    assert layout.row(1) == ("equal", 16, 4, 16, 4)
+    assert layout.row(2) == ("insert", 20, 0, 20, 3)
+    assert layout.row(3) == ("equal", 20, 16, 23, 16)
+    assert layout.row_of(25, side=0) == 3 and layout.row_of(21, side=1) == 2
+    assert list(layout.diff_rows()) == [(2, 3)]
+    plain = RowLayout.plain(40, 33, 16)
+    assert plain.rows == 3 and plain.row(2) == ("replace", 32, 8, 32, 1)
+    assert list(regions_to_rows(scan_regions(b"a" * 40, b"a" * 17 + b"b"), 16)) == [(1, 3)]
+
+
+def test_file_regions_and_hex_rows_stream(tmp_path):
+    a = bytearray(_random_bytes(1000))
+    b = bytearray(a)
+    b[40] ^= 1
+    b[500:503] = b"xyz"
+    b += b"TAIL"
+    pa, pb = tmp_path / "a.bin", tmp_path / "b.bin"
+    pa.write_bytes(bytes(a))
+    pb.write_bytes(bytes(b))
+    regions = list(iter_file_regions(str(pa), str(pb), block=64))
+    assert regions == list(scan_regions(bytes(a), bytes(b)))
+
+    rows = list(iter_hex_rows(str(pa), str(pb), regions, 16, context=1))
+    tags = [(tag, off) for tag, off, _, _ in rows]
+    assert tags[:4] == [("...", 1), (" ", 16), ("!", 32), (" ", 48)]
+    assert tags[-3:] == [("...", 28), (" ", 0x3D0), ("!", 0x3E0)]
+    assert sum(1 for t, _ in tags if t == "!") == 3
+
+    text = "".join(iter_hex_text(rows))
+    plus = next(line for line in text.splitlines() if line.startswith("000003E0 + "))
+    assert plus.endswith("TAIL|")
+
+
+def test_hex_formatting_helpers():
+    assert hex_cells(b"\x00\xab\x10") == "00 AB 10"
+    assert ascii_cells(b"A\x00~\x7f") == "A.~."
+    assert diff_marks(b"\x01\x02\x03", b"\x01\xff\x03\x04") == "   ^^    ^^"
@@ -0,0 +1,192 @@
+import random
+import time
+
+import pytest
+
+from app.diff import DIFF_ALGORITHMS, DiffBudget, Hunk, compute_diff, diff_as_html, diff_lines, intraline_spans, iter_html_report, matching_blocks, myers_diff
+
+
+def _trace_myers_diff(a, b):
+    """The original trace-snapshotting engine, kept as a reference."""
+    N, M = len(a), len(b)
+    v = {1: 0}
+    trace = []
+    for d in range(0, N + M + 1):
+        trace.append(v.copy())
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
+                x = v.get(k + 1, 0)
+            else:
+                x = v.get(k - 1, 0) + 1
+            y = x - k
+            while x < N and y < M and a[x] == b[y]:
+                x += 1
+                y += 1
+            v[k] = x
+            if x >= N and y >= M:
+                break
+        else:
+            continue
+        break
+
+    res = []
+    x, y = N, M
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v.get(k - 1, -1) < v.get(k + 1, -1)):
+            pk = k + 1
+        else:
+            pk = k - 1
+        px = v.get(pk, 0)
+        py = px - pk
+        while x > px and y > py:
+            res.append((' ', a[x - 1]))
+            x -= 1
+            y -= 1
+        if d == 0:
+            break
+        if x == px:
+            res.append(('+', b[y - 1]))
+            y -= 1
+        else:
+            res.append(('-', a[x - 1]))
+            x -= 1
+    res.reverse()
+    return res
+
+
+def _sides(diff):
+    left = [t for tag, t in diff if tag != '+']
+    right = [t for tag, t in diff if tag != '-']
+    return left, right
+
+
+def _cost(diff):
+    return sum(1 for tag, _ in diff if tag != ' ')
+
+
+def test_empty_inputs():
+    assert myers_diff([], []) == []
+    assert myers_diff(["a"], []) == [('-', "a")]
+    assert myers_diff([], ["b"]) == [('+', "b")]
+
+
+def test_same_edit_cost_as_trace_engine_on_random_inputs():
+    rng = random.Random(1234)
+    for _ in range(500):
+        alphabet = "abcde"[:rng.randint(1, 5)]
+        a = [rng.choice(alphabet) for _ in range(rng.randint(0, 30))]
+        b = [rng.choice(alphabet) for _ in range(rng.randint(0, 30))]
+        expected = _trace_myers_diff(a, b)
+        got = myers_diff(a, b)
+        assert _sides(got) == (a, b)
+        # both engines must find a shortest edit script
+        assert _cost(got) == _cost(expected)
+
+
+def test_identical_output_for_single_edits():
+    a = [f"line {i}" for i in range(50)]
+    b = a[:20] + ["inserted"] + a[20:35] + a[36:]
+    assert myers_diff(a, b) == _trace_myers_diff(a, b)
+
+
+def test_matching_blocks_keep_shared_head_and_tail():
+    a = ["h1", "h2", "x", "y", "t1", "t2"]
+    b = ["h1", "h2", "y", "z", "t1", "t2"]
+    assert matching_blocks(a, b) == [(0, 0, 2), (3, 2, 1), (4, 4, 2)]
+    assert matching_blocks(a, a) == [(0, 0, 6)]
+    assert matching_blocks([], []) == []
+
+
+@pytest.mark.parametrize("algorithm", DIFF_ALGORITHMS)
+def test_every_algorithm_reproduces_both_sides(algorithm):
+    rng = random.Random(99)
+    for _ in range(300):
+        alphabet = "abcdefgh"[:rng.randint(1, 8)]
+        a = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        b = [rng.choice(alphabet) for _ in range(rng.randint(0, 40))]
+        assert _sides(diff_lines(a, b, algorithm)) == (a, b)
+
+
+def test_histogram_splits_interleaved_edits_evenly():
+    a = [f"line {i}" for i in range(4000)]
+    b = [line + " changed" if i % 2 else line for i, line in enumerate(a)]
+    # every anchor is unique and one line long; picking the first one each
+    # time peeled a single line per split and took quadratic time
+    diff = diff_lines(a, b, "histogram")
+    assert _sides(diff) == (a, b)
+    assert _cost(diff) == 4000
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        diff_lines(["a"], ["b"], "nope")
+
+
+def test_cost_cap_falls_back_to_approximate_diff():
+    rng = random.Random(7)
+    a = [str(rng.randrange(50)) for _ in range(2000)]
+    b = [str(rng.randrange(50)) for _ in range(2000)]
+    budget = DiffBudget(max_cost=10)
+    diff = diff_lines(a, b, "myers", budget)
+    assert budget.approximate
+    assert _sides(diff) == (a, b)
+    assert "Approximate diff" in diff_as_html("\n".join(a), "\n".join(b), budget=budget)
+
+    small = DiffBudget(max_cost=10, timeout=60)
+    assert diff_lines(["a", "b", "c"], ["a", "x", "c"], "myers", small) == [
+        (' ', "a"), ('-', "b"), ('+', "x"), (' ', "c")]
+    assert not small.approximate
+
+
+@pytest.mark.parametrize("algorithm", ["patience", "histogram"])
+def test_splitters_honour_the_deadline(algorithm):
+    a = [f"line {i}" for i in range(16000)]
+    b = [line + " changed" if i % 2 else line for i, line in enumerate(a)]
+    budget = DiffBudget(timeout=0.001)
+    start = time.monotonic()
+    diff = diff_lines(a, b, algorithm, budget)
+    assert budget.approximate and budget.timed_out
+    assert time.monotonic() - start < 5
+    assert _sides(diff) == (a, b)
+
+
+def test_compute_diff_returns_index_hunks():
+    a = ["keep", "old", "same", "gone"]
+    b = ["keep", "new", "same", "added"]
+    result = compute_diff(a, b)
+    assert list(result) == [
+        Hunk('equal', 0, 1, 0, 1),
+        Hunk('replace', 1, 2, 1, 2),
+        Hunk('equal', 2, 3, 2, 3),
+        Hunk('replace', 3, 4, 3, 4),
+    ]
+    assert list(result.rows()) == diff_lines(a, b)
+    assert list(result.aligned_rows())[1] == ('replace', "old", "new")
+    assert not result.approximate
+
+
+def test_html_report_collapses_context_and_escapes():
+    a = [f"line {i}" for i in range(20)] + ["<old>"] + [f"tail {i}" for i in range(20)]
+    b = a[:20] + ["<new & improved>"] + a[21:]
+    html = "".join(iter_html_report(compute_diff(a, b), context=2, intraline="off"))
+    assert "&lt;old&gt;" in html and "&lt;new &amp; improved&gt;" in html
+    assert "18 unchanged lines" in html
+    assert "line 17" not in html and "line 18" in html and "tail 1" in html
+    assert "tail 2" not in html
+    assert html.count("<tr") == 2 + 2 + 2 + 2
+    assert "line 0" in diff_as_html("\n".join(a), "\n".join(b))
+
+
+def test_intraline_spans_word_and_char():
+    old, new = "total = price * 2", "total = cost * 3"
+    assert intraline_spans(old, new) == (((8, 13), (16, 17)), ((8, 12), (15, 16)))
+    assert intraline_spans("abcd", "abXd", "char") == (((2, 3),), ((2, 3),))
+    assert intraline_spans("x " * 5000, "y " * 5000) is None
+    long_a = "a " * 3000 + "old" + " z" * 3000
+    long_b = "a " * 3000 + "new" + " z" * 3000
+    assert intraline_spans(long_a, long_b) == (((6000, 6003),), ((6000, 6003),))
+    html = diff_as_html(old, new)
+    assert "<span class='chg'>price</span>" in html
+    assert "<span class='chg'>cost</span>" in html
@@ -0,0 +1,62 @@
+import os
+
+from app.diff import DiffBudget, compute_diff
+from app.diff_cache import DiffCache
+
+
+class _CountingCache(DiffCache):
+    puts = 0
+
+    def put(self, key, blocks, approximate):
+        self.puts += 1
+        super().put(key, blocks, approximate)
+
+
+def test_cached_result_round_trips(tmp_path):
+    cache = _CountingCache(tmp_path)
+    a = ["one", "two", "three", "four"]
+    b = ["one", "2", "three", "four", "five"]
+    first = compute_diff(a, b, cache=cache)
+    second = compute_diff(list(a), list(b), cache=cache)
+    assert cache.puts == 1
+    assert list(second) == list(first)
+    assert list(second.rows()) == list(first.rows())
+    # different options are a different entry
+    compute_diff(a, b, "histogram", cache=cache)
+    assert cache.puts == 2
+
+
+def test_only_cost_capped_approximations_are_cached(tmp_path):
+    cache = _CountingCache(tmp_path)
+    a = [f"a{i}" for i in range(200)]
+    b = [f"b{i}" for i in range(200)]
+    timed = compute_diff(a, b, budget=DiffBudget(timeout=-1), cache=cache)
+    assert timed.approximate and cache.puts == 0
+    capped = compute_diff(a, b, budget=DiffBudget(max_cost=4), cache=cache)
+    assert capped.approximate and cache.puts == 1
+
+
+def test_empty_and_blank_line_inputs_do_not_collide(tmp_path):
+    cache = DiffCache(tmp_path)
+    assert cache.key([], ["x"], "myers") != cache.key([""], ["x"], "myers")
+
+
+def test_lru_eviction_keeps_recent_entries(tmp_path):
+    cache = DiffCache(tmp_path, max_bytes=10_000)
+    blocks = [(i, i, 1) for i in range(100)]   # ~2.4 KB per entry
+    for n in range(3):
+        cache.put(f"k{n}", blocks, False)
+        os.utime(tmp_path / f"k{n}.bin", ns=(n * 10**9, n * 10**9))
+    assert cache.get("k0") is not None          # touching k0 makes it most recent
+    cache.put("k3", blocks, False)
+    cache.put("k4", blocks, False)
+    names = sorted(p.name for p in tmp_path.glob("*.bin"))
+    assert "k0.bin" in names and "k1.bin" not in names
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.bin")) <= 10_000
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = DiffCache(tmp_path)
+    (tmp_path / "bad.bin").write_bytes(b"garbage")
+    assert cache.get("bad") is None
+    assert not (tmp_path / "bad.bin").exists()
@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+import sys
+
+import pytest
+
+import app.folder_compare
+from scripts import folder_cli
+
+
+def _run(monkeypatch, capsys, *args):
+    monkeypatch.setattr(sys, "argv", ["folder_cli.py", *args])
+    rc = folder_cli.main()
+    out, err = capsys.readouterr()
+    return rc, out, err
+
+
+@pytest.fixture
+def trees(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    write(left, "same.txt", b"same")
+    write(right, "same.txt", b"same")
+    return left, right
+
+
+def test_exit_same_and_different_with_jsonl(monkeypatch, capsys, trees, write):
+    left, right = trees
+    rc, out, _ = _run(monkeypatch, capsys, "--left", str(left), "--right", str(right), "--mode", "content")
+    assert rc == folder_cli.EXIT_SAME and out == ""
+
+    write(left, "d/x.txt", b"one")
+    write(right, "d/x.txt", b"two")
+    write(left, "gone.txt", b"")
+    rc, out, _ = _run(monkeypatch, capsys, "--left", str(left), "--right", str(right), "--mode", "content")
+    assert rc == folder_cli.EXIT_DIFFERENT
+    rows = {r["relpath"].replace("\\", "/"): r for r in map(json.loads, out.splitlines())}
+    assert set(rows) == {"d/x.txt", "gone.txt"}
+    assert rows["d/x.txt"]["status"] == "Different" and rows["gone.txt"]["status"] == "Left only"
+    assert list(rows["gone.txt"]) == folder_cli.FIELDS
+
+
+def test_csv_output_with_all(monkeypatch, capsys, trees):
+    left, right = trees
+    rc, out, _ = _run(monkeypatch, capsys, "--left", str(left), "--right", str(right),
+                      "--format", "csv", "--all")
+    assert rc == folder_cli.EXIT_SAME
+    rows = list(csv.DictReader(io.StringIO(out)))
+    assert [(r["relpath"], r["status"], r["left_size"]) for r in rows] == [("same.txt", "Equal", "4")]
+
+
+def test_missing_root_is_an_error(monkeypatch, capsys, tmp_path, trees):
+    left, _ = trees
+    rc, out, err = _run(monkeypatch, capsys, "--left", str(tmp_path / "nope1"), "--right", str(tmp_path / "nope2"))
+    assert rc == folder_cli.EXIT_ERROR and out == "" and "nope1" in err
+    rc, out, _ = _run(monkeypatch, capsys, "--left", str(left), "--right", str(tmp_path / "nope2"))
+    assert rc == folder_cli.EXIT_ERROR and out == ""
+
+
+def test_unreadable_is_an_error(monkeypatch, capsys, trees):
+    left, right = trees
+
+    def unreadable(a, b):
+        raise PermissionError(a)
+
+    monkeypatch.setattr(app.folder_compare, "files_equal", unreadable)
+    rc, out, _ = _run(monkeypatch, capsys, "--left", str(left), "--right", str(right), "--mode", "bytes")
+    assert rc == folder_cli.EXIT_ERROR
+    assert json.loads(out)["status"] == "Unreadable"
+
+
+def test_size_time_reads_no_bytes(monkeypatch, capsys, trees):
+    left, right = trees
+    _, _, err = _run(monkeypatch, capsys, "--left", str(left), "--right", str(right))
+    assert " 0.0 MB/s" in err
@@ -0,0 +1,170 @@
+import os
+import threading
+
+from app.folder_compare import compare_dirs, walk
+
+
+def _os_walk_rels(root):
+    out = set()
+    for dirpath, _, files in os.walk(root):
+        for f in files:
+            if os.path.exists(os.path.join(dirpath, f)):
+                out.add(os.path.relpath(os.path.join(dirpath, f), root))
+    return out
+
+
+def test_walk_matches_os_walk(tmp_path, write):
+    for rel in ["a.txt", "sub/b.txt", "sub/deeper/c.bin", "other/d"]:
+        write(tmp_path, rel, rel.encode())
+    (tmp_path / "empty").mkdir()
+    os.symlink(tmp_path / "sub", tmp_path / "link_to_sub")
+    os.symlink(tmp_path / "missing", tmp_path / "dangling")
+    entries = walk(str(tmp_path), workers=4)
+    assert {e.rel for e in entries} == _os_walk_rels(tmp_path)
+    by_rel = {e.rel: e for e in entries}
+    e = by_rel[os.path.join("sub", "deeper", "c.bin")]
+    assert e.size == len(b"sub/deeper/c.bin")
+    assert e.path == str(tmp_path / "sub" / "deeper" / "c.bin")
+
+
+def test_compare_dirs_statuses(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    write(left, "same.txt", b"same")
+    write(right, "same.txt", b"same")
+    write(left, "changed.txt", b"one")
+    write(right, "changed.txt", b"two!")
+    write(left, "only_left/x", b"")
+    write(right, "only_right/y", b"")
+    rows = {r["relpath"]: r["status"] for r in compare_dirs(str(left), str(right), "content", do_hash=True)}
+    assert rows == {
+        "same.txt": "Equal",
+        "changed.txt": "Different",
+        os.path.join("only_left", "x"): "Left only",
+        os.path.join("only_right", "y"): "Right only",
+    }
+
+
+def test_content_mode_skips_hashing_size_mismatches(tmp_path, monkeypatch, write):
+    import app.folder_compare as fc
+    left, right = tmp_path / "l", tmp_path / "r"
+    for i in range(6):
+        write(left, f"eq{i}", b"same %d" % i)
+        write(right, f"eq{i}", b"same %d" % i)
+    write(left, "grown", b"short")
+    write(right, "grown", b"much longer")
+    hashed = []
+    real_hash = fc.hash_file
+    monkeypatch.setattr(fc, "hash_file", lambda p, **kw: hashed.append(p) or real_hash(p, **kw))
+    rows = {r["relpath"]: r["status"] for r in
+            compare_dirs(str(left), str(right), "content", do_hash=True, hash_workers=3, hash_inflight=1)}
+    assert rows["grown"] == "Different"
+    assert all(rows[f"eq{i}"] == "Equal" for i in range(6))
+    assert len(hashed) == 12 and not any(p.endswith("grown") for p in hashed)
+
+
+def test_files_equal_tiers(tmp_path, write):
+    from app.folder_compare import files_equal
+    base = bytes(range(256)) * 40          # 10 KiB, several 1 KiB blocks
+    a = write(tmp_path, "a", base)
+    for name, data, expected in [
+        ("same", base, True),
+        ("head", b"\xff" + base[1:], False),
+        ("tail", base[:-1] + b"\x00", False),
+        ("middle", base[:5000] + b"\xff" + base[5001:], False),
+        ("shorter", base[:-1], False),
+    ]:
+        b = write(tmp_path, name, data)
+        assert files_equal(str(a), str(b), blocksize=1024) is expected, name
+    assert files_equal(str(a), str(a), blocksize=1024)
+
+
+def test_bytes_mode(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    write(left, "same", b"x" * 3000)
+    write(right, "same", b"x" * 3000)
+    write(left, "diff", b"x" * 3000)
+    write(right, "diff", b"x" * 2999 + b"y")
+    write(left, "size", b"x")
+    write(right, "size", b"xx")
+    rows = {r["relpath"]: r["status"] for r in compare_dirs(str(left), str(right), "bytes")}
+    assert rows == {"same": "Equal", "diff": "Different", "size": "Different"}
+
+
+def test_iter_compare_dirs_streams_and_closes(tmp_path, write):
+    from app.folder_compare import iter_compare_dirs
+    left, right = tmp_path / "l", tmp_path / "r"
+    for i in range(20):
+        write(left, f"f{i:02}", b"%d" % i)
+        write(right, f"f{i:02}", b"%d" % (i % 5))
+    write(left, "only", b"")
+    totals = []
+    rows = list(iter_compare_dirs(str(left), str(right), "content", do_hash=True, on_total=totals.append))
+    assert totals == [21]
+    order = [r["relpath"] for r in rows]
+    assert order.index("only") < order.index("f00")   # decided without reading goes first
+    by_path = lambda r: r["relpath"]
+    assert sorted(rows, key=by_path) == sorted(compare_dirs(str(left), str(right), "content", do_hash=True), key=by_path)
+
+    gen = iter_compare_dirs(str(left), str(right), "bytes", hash_workers=1)
+    next(gen)
+    gen.close()
+
+    cancel = threading.Event()
+    gen = iter_compare_dirs(str(left), str(right), "content", do_hash=True, cancel=cancel)
+    next(gen)
+    cancel.set()
+    assert all(r["status"] != "Equal" for r in gen)   # no pair is read once cancelled
+
+
+def test_compare_level_and_subtree_differs(tmp_path, write):
+    from app.folder_compare import compare_level, subtree_differs
+    left, right = tmp_path / "l", tmp_path / "r"
+    write(left, "top.txt", b"a")
+    write(right, "top.txt", b"b")
+    write(left, "same/deep/x", b"1")
+    write(right, "same/deep/x", b"1")
+    write(left, "changed/deep/y", b"1")
+    write(right, "changed/deep/y", b"2")
+    write(left, "gone/z", b"")
+    rows = compare_level(str(left), str(right), "", "content", do_hash=True)
+    assert [(r["relpath"], r["is_dir"], r["status"]) for r in rows] == [
+        ("changed", True, ""),
+        ("gone", True, "Left only"),
+        ("same", True, ""),
+        ("top.txt", False, "Different"),
+    ]
+    inner = compare_level(str(left), str(right), "changed", "content", do_hash=True)
+    assert [(r["relpath"], r["is_dir"]) for r in inner] == [(os.path.join("changed", "deep"), True)]
+    assert subtree_differs(str(left), str(right), "changed", "content", do_hash=True)
+    assert not subtree_differs(str(left), str(right), "same", "content", do_hash=True)
+
+
+def test_differing_dirs_covers_whole_subtree(tmp_path, write):
+    from app.folder_compare import differing_dirs
+    left, right = tmp_path / "l", tmp_path / "r"
+    for rel in ["a/same/x", "a/b/c/y", "a/b/ok"]:
+        write(left, rel, b"1")
+        write(right, rel, b"1")
+    write(right, "a/b/c/y", b"2")
+    write(left, "a/b/c/d/only", b"")
+    j = os.path.join
+    assert differing_dirs(str(left), str(right), "a", "content", do_hash=True) == {
+        "a", j("a", "b"), j("a", "b", "c"), j("a", "b", "c", "d")}
+    assert differing_dirs(str(left), str(right), j("a", "same")) == set()
+    assert differing_dirs(str(left), str(right)) >= {"", "a"}
+
+
+def test_compare_dirs_compact_result(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    for rel in ["a.txt", "a/b", "a/c/d", "z"]:
+        write(left, rel, b"1")
+    for rel in ["a.txt", "a/b", "a/c/e", "z"]:
+        write(right, rel, b"22")
+    result = compare_dirs(str(left), str(right))
+    assert len(result) == 5
+    # grouped by directory, then name: the merge-join order
+    assert [r["relpath"] for r in result] == [
+        "a.txt", "z", os.path.join("a", "b"), os.path.join("a", "c", "d"), os.path.join("a", "c", "e")]
+    assert result.counts() == {"Different": 3, "Left only": 1, "Right only": 1}
+    assert result[-1]["right_path"] == str(right / "a" / "c" / "e")
+    assert result[1:3] == [result[1], result[2]]
@@ -0,0 +1,75 @@
+import os
+import time
+
+import app.folder_compare as fc
+from app.hash_index import HashIndex
+
+
+def _old_file(path, data):
+    path.write_bytes(data)
+    past = time.time() - 60
+    os.utime(path, (past, past))
+    return str(path)
+
+
+def test_unchanged_file_is_not_reread(tmp_path, monkeypatch):
+    index = HashIndex(tmp_path / "idx.sqlite")
+    f = _old_file(tmp_path / "a.bin", b"payload")
+    digest = fc.hash_file(f, index=index)
+    assert len(index) == 1
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr("builtins.open", lambda p, *a, **k: opened.append(p) or real_open(p, *a, **k))
+    assert fc.hash_file(f, index=index) == digest
+    assert opened == []
+
+
+def test_changed_metadata_invalidates_entry(tmp_path):
+    index = HashIndex(tmp_path / "idx.sqlite")
+    f = _old_file(tmp_path / "a.bin", b"one")
+    first = fc.hash_file(f, index=index)
+    _old_file(tmp_path / "a.bin", b"two")
+    os.utime(f, (time.time() - 30, time.time() - 30))
+    assert fc.hash_file(f, index=index) != first
+
+
+def test_recently_modified_files_are_not_recorded(tmp_path):
+    index = HashIndex(tmp_path / "idx.sqlite")
+    f = tmp_path / "fresh"
+    f.write_bytes(b"racy")
+    fc.hash_file(str(f), index=index)
+    assert len(index) == 0
+
+
+def test_prune_and_invalidate(tmp_path):
+    index = HashIndex(tmp_path / "idx.sqlite", max_entries=2)
+    (tmp_path / "sub").mkdir()
+    paths = [_old_file(tmp_path / "sub" / f"f{i}", b"%d" % i) for i in range(4)]
+    for p in paths:
+        fc.hash_file(p, index=index)
+    index.prune()
+    assert len(index) == 2
+    index.invalidate(str(tmp_path / "sub"))
+    assert len(index) == 0
+    index.close()
+
+
+def test_algorithms_match_hashlib_on_both_read_paths(tmp_path, monkeypatch):
+    import hashlib
+    data = os.urandom(300_000)
+    f = tmp_path / "blob"
+    f.write_bytes(data)
+    for threshold in (1 << 40, 1):   # readinto buffer, then mmap
+        monkeypatch.setattr(fc, "MMAP_THRESHOLD", threshold)
+        assert fc.hash_file(str(f)) == hashlib.sha256(data).hexdigest()
+        assert fc.hash_file(str(f), algorithm="blake2b") == hashlib.blake2b(data).hexdigest()
+        assert fc.hash_file(str(f), blocksize=4096, algorithm="sha1") == hashlib.sha1(data).hexdigest()
+
+
+def test_git_sha1_matches_git_hash_object(tmp_path):
+    f = tmp_path / "hello"
+    f.write_bytes(b"hello\n")
+    assert fc.hash_file(str(f), algorithm="git-sha1") == "ce013625030ba8dba906f756967f9e9ca394464a"
+    (tmp_path / "empty").write_bytes(b"")
+    assert fc.hash_file(str(tmp_path / "empty"), algorithm="git-sha1") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
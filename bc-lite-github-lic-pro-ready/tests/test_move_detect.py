@@ -0,0 +1,49 @@
+import os
+
+from app.folder_compare import compare_dirs
+from app.move_detect import detect_moves, estimate_similarity, minhash_signature
+
+
+def _text(n, tag=b""):
+    return b"".join(b"line %d of the config %s\n" % (i, tag) for i in range(n))
+
+
+def test_minhash_estimates_jaccard():
+    a = list(range(1000))
+    b = list(range(500, 1500))          # Jaccard 1/3
+    sim = estimate_similarity(minhash_signature(a), minhash_signature(b))
+    assert 0.15 < sim < 0.55
+    assert estimate_similarity(minhash_signature(a), minhash_signature(a)) == 1.0
+
+
+def test_detects_exact_moves_renames_and_near_duplicates(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    write(left, "a/x.cfg", _text(50))
+    write(right, "b/x.cfg", _text(50))                       # moved
+    write(left, "old.bin", b"\0\1\2" * 100)
+    write(right, "new.bin", b"\0\1\2" * 100)                  # renamed binary
+    body = _text(200, b"shared")
+    write(left, "docs/guide.txt", body)
+    write(right, "manual/guide-v2.txt", body[:-40] + b"one edited line at the end\n")
+    write(left, "gone.txt", _text(30, b"left"))
+    write(right, "fresh.txt", b"completely different\ncontent here\n")
+    rows = compare_dirs(str(left), str(right))
+    moved, unmatched = detect_moves(rows)
+    by_status = {(m["status"], m["relpath"]): m["similarity"] for m in moved}
+    j = os.path.join
+    assert by_status[("Moved", f"{j('a', 'x.cfg')} → {j('b', 'x.cfg')}")] == 100
+    assert by_status[("Renamed", "old.bin → new.bin")] == 100
+    near = by_status[("Renamed", f"{j('docs', 'guide.txt')} → {j('manual', 'guide-v2.txt')}")]
+    assert 50 <= near < 100
+    assert sorted(r["relpath"] for r in unmatched) == ["fresh.txt", "gone.txt"]
+    assert detect_moves(rows, near=False)[0][0]["similarity"] == 100
+
+
+def test_empty_files_are_not_paired(tmp_path, write):
+    left, right = tmp_path / "l", tmp_path / "r"
+    write(left, "a/__init__.py", b"")
+    write(right, "b/__init__.py", b"")
+    write(left, "x.lock", b"")
+    write(right, "y.lock", b"")
+    moved, unmatched = detect_moves(compare_dirs(str(left), str(right)))
+    assert moved == [] and len(unmatched) == 4
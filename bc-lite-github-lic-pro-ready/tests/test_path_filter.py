@@ -0,0 +1,45 @@
+import os
+
+from app.folder_compare import compare_dirs, walk
+from app.path_filter import PathFilter, split_patterns
+
+
+def _j(*parts):
+    return os.path.join(*parts)
+
+
+def test_gitignore_style_rules():
+    f = PathFilter(exclude=["*.pyc", "build/", "/top.txt", "docs/**/*.tmp", "!keep.pyc", "# comment"])
+    assert f.excludes_name(_j("a", "b", "x.pyc"))
+    assert not f.excludes_name(_j("a", "keep.pyc"))          # later '!' rule wins
+    assert f.excludes_dir(_j("src", "build"))
+    assert not f.excludes_name(_j("src", "build"))            # dir-only rule
+    assert f.excludes_name("top.txt") and not f.excludes_name(_j("sub", "top.txt"))
+    assert f.excludes_name(_j("docs", "a", "b", "c.tmp")) and f.excludes_name(_j("docs", "c.tmp"))
+    assert not f.excludes_name(_j("src", "c.tmp"))
+
+
+def test_include_size_and_age():
+    f = PathFilter(include=["*.py", "Makefile"], min_size=2, max_size=10, max_age_days=1)
+    assert not f.excludes_name(_j("pkg", "mod.py")) and not f.excludes_name("Makefile")
+    assert f.excludes_name("README.md")
+    assert f.excludes_stat(1, 2e9) and f.excludes_stat(11, 2e9) and not f.excludes_stat(5, 2e9)
+    assert f.excludes_stat(5, 0.0)
+    assert split_patterns(".git/; node_modules/\n*.o") == [".git/", "node_modules/", "*.o"]
+
+
+def test_excluded_dirs_are_pruned(tmp_path, monkeypatch):
+    import app.folder_compare as fc
+    for side in ("l", "r"):
+        for rel in ["src/a.py", "src/__pycache__/a.pyc", "node_modules/x/y.js", ".git/HEAD"]:
+            p = tmp_path / side / rel
+            p.parent.mkdir(parents=True, exist_ok=True)
+            p.write_text(side)
+    scanned = []
+    real_scan = fc._scan_dir
+    monkeypatch.setattr(fc, "_scan_dir", lambda p, rel, flt=None: scanned.append(rel) or real_scan(p, rel, flt))
+    flt = PathFilter(exclude=[".git/", "node_modules/", "__pycache__/"])
+    assert [e.rel for e in walk(str(tmp_path / "l"), path_filter=flt)] == [_j("src", "a.py")]
+    assert not any("node_modules" in r or ".git" in r or "__pycache__" in r for r in scanned)
+    rows = compare_dirs(str(tmp_path / "l"), str(tmp_path / "r"), path_filter=flt)
+    assert [r["relpath"] for r in rows] == [_j("src", "a.py")]
@@ -0,0 +1,62 @@
+from app.three_way_merge import CONFLICT_END, CONFLICT_MID, CONFLICT_START, merge_lines, merge_text
+
+
+def _lines(n):
+    return "".join(f"line {i}\n" for i in range(n))
+
+
+def test_insertions_do_not_shift_into_conflicts():
+    base = _lines(10)
+    left = "new top\n" + base.replace("line 2\n", "line 2 L\n")
+    right = base.replace("line 7\n", "line 7 R\n") + "end\n"
+    merged = merge_text(base, left, right)
+    assert CONFLICT_START not in merged
+    assert merged == "new top\n" + base.replace("line 2\n", "line 2 L\n").replace("line 7\n", "line 7 R\n") + "end\n"
+
+
+def test_adjacent_and_identical_changes_merge_cleanly():
+    base = _lines(6)
+    left = base.replace("line 2\n", "two\n")
+    right = base.replace("line 3\n", "three\n").replace("line 5\n", "five\n")
+    both = left.replace("line 5\n", "five\n")
+    merged, conflicts = merge_lines(*(t.splitlines(True) for t in (base, left, both)))
+    assert conflicts == 0 and "".join(merged) == both
+    assert merge_text(base, left, right) == "line 0\nline 1\ntwo\nthree\nline 4\nfive\n"
+
+
+def test_overlapping_changes_conflict_on_differing_lines_only():
+    base = _lines(6)
+    left = base.replace("line 2\nline 3\n", "same\nleft\n")
+    right = base.replace("line 2\nline 3\n", "same\nright\n")
+    merged, conflicts = merge_lines(*(t.splitlines(True) for t in (base, left, right)))
+    assert conflicts == 1
+    assert "".join(merged) == ("line 0\nline 1\nsame\n" + CONFLICT_START + "left\n" + CONFLICT_MID
+                               + "right\n" + CONFLICT_END + "line 4\nline 5\n")
+
+
+def test_same_spot_insertions_conflict_and_missing_newline_is_kept_apart():
+    merged = merge_text("a\nb\n", "a\nb\nc", "a\nb\nd")
+    assert merged == "a\nb\n" + CONFLICT_START + "c\n" + CONFLICT_MID + "d\n" + CONFLICT_END
+
+
+def test_large_merge_with_scattered_edits():
+    n = 20000
+    base = [f"row {i}\n" for i in range(n)]
+    left = list(base)
+    right = list(base)
+    for k in range(0, n, 97):
+        left[k] = f"left {k}\n"
+    inserts = [k for k in range(50, n, 89) if k % 97]     # not right before an edited line
+    for done, k in enumerate(inserts):
+        right.insert(k + done, f"right {k}\n")
+    merged, conflicts = merge_lines(base, left, right)
+    assert conflicts == 0
+    assert len(merged) == len(right)
+    assert sum(line.startswith("left ") for line in merged) == len(range(0, n, 97))
+    assert sum(line.startswith("right ") for line in merged) == len(inserts)
+
+
+def test_missing_final_newline_does_not_join_following_lines():
+    assert merge_text("a\nb\n", "a\nB", "a\nb\nc\n") == "a\nB\nc\n"
+    assert merge_text("a\nb\n", "a\nb\nc\n", "a\nB") == "a\nB\nc\n"
+    assert merge_text("a\nb", "a\nb\nc", "A\nb") == "A\nb\nc"